@@ -0,0 +1,413 @@
+'''
+Benchmarks for phrase-randomizer.py, run outside of OBS using the obspython stand-in in this directory.
+
+Results are printed as JSON (or written with --output) so they can be kept and compared between changes with --compare.
+
+Usage:
+	python benchmarks/benchmark.py [--quick] [--output results.json] [--compare baseline.json]
+
+'''
+
+# Standard libraries
+import sys
+import argparse
+import platform
+import importlib.util
+from contextlib import redirect_stdout
+from json import dumps, loads
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter, monotonic
+from threading import Thread
+from http.client import HTTPConnection
+
+BENCHMARK_DIRECTORY = Path(__file__).parent.resolve()
+SCRIPT_PATH = BENCHMARK_DIRECTORY.parent / 'phrase-randomizer.py'
+
+# Our stand-in has to be found before the script is loaded
+sys.path.insert(0, str(BENCHMARK_DIRECTORY))
+import obspython as obs # noqa: E402
+
+
+def load_script():
+	''' Loads phrase-randomizer.py as a module. The file name isn't a valid module name, so it can't be imported normally.
+	'''
+	spec = importlib.util.spec_from_file_location('phrase_randomizer', SCRIPT_PATH)
+	script = importlib.util.module_from_spec(spec)
+	spec.loader.exec_module(script)
+	return script
+
+
+# Helpers
+########################################
+
+def percentile(samples:list, fraction:float) -> float:
+	''' Returns the value at the given fraction of the sorted samples.
+	'''
+	ordered = sorted(samples)
+	return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def summarize(samples:list, unit:str='us') -> dict:
+	''' Summarizes timing samples given in seconds.
+
+	Arguments:
+		samples([float]): Samples in seconds.
+		unit(str='us'): Unit to report in, `us` or `ms`. Use `count` for samples that aren't times.
+	'''
+	scale = {'us': 1e6, 'ms': 1e3, 'count': 1}[unit]
+	return {
+		'unit': unit,
+		'count': len(samples),
+		'mean': round(sum(samples) / len(samples) * scale, 3),
+		'p50': round(percentile(samples, 0.50) * scale, 3),
+		'p95': round(percentile(samples, 0.95) * scale, 3),
+		'max': round(max(samples) * scale, 3),
+	}
+
+def time_calls(function, iterations:int, setup=None) -> list:
+	''' Times each call to a function separately.
+
+	Arguments:
+		function(callable): Function to time.
+		iterations(int): Number of calls.
+		setup(callable=None): Called before each call, outside of the timing.
+	'''
+	samples = []
+	for _ in range(iterations):
+		if setup is not None:
+			setup()
+		start = perf_counter()
+		function()
+		samples.append(perf_counter() - start)
+	return samples
+
+def write_list(path:Path, count:int, prefix:str) -> None:
+	''' Writes a list file with count entries.
+	'''
+	with open(path, 'w', encoding='utf-8') as list_file:
+		list_file.writelines(f'{prefix}_{index}\n' for index in range(count))
+
+
+# Benchmarks
+########################################
+
+def bench_randomizer(script, lists_dir:Path, scale:int) -> dict:
+	''' Benchmarks the randomizer on its own.
+	'''
+	results = {}
+	phrases = [f'Phrase {index}: {{p:1}} high-fives {{p:2}} with {{i}} while {{p}} watches' for index in range(5000)]
+
+	randomizer = script.Phrase_Randomizer(lists_dir)
+	randomizer.set_phrase_list(phrases)
+	phrase = phrases[0]
+	randomizer.fill_phrase(phrase)
+
+	results['fill_phrase'] = summarize(time_calls(lambda: randomizer.fill_phrase(phrase), 2000 * scale))
+
+	# The same phrase, with a list whose entries are filled from two other lists
+	write_list(lists_dir / 'adjective.txt', 1000, 'adjective')
+	write_list(lists_dir / 'gun.txt', 1000, 'gun')
+	(lists_dir / 'weapon.txt').write_text('{adjective} {gun}\n{gun} with a {adjective} grip\n', encoding='utf-8')
+	nested_phrase = 'Phrase 0: {p:1} high-fives {p:2} with {weapon} while {p} watches'
+	randomizer.fill_phrase(nested_phrase)
+	results['fill_phrase_nested'] = summarize(time_calls(lambda: randomizer.fill_phrase(nested_phrase), 2000 * scale))
+	results['get_phrase'] = summarize(time_calls(randomizer.get_phrase, 2000 * scale))
+	results['get_dummy_phrases_12'] = summarize(time_calls(lambda: randomizer.get_dummy_phrases(12), 200 * scale))
+	results['get_dummy_phrases_10000'] = summarize(time_calls(lambda: randomizer.get_dummy_phrases(10000), 2 * scale), 'ms')
+
+	randomizer.set_phrase_duplication(False)
+	results['get_phrase_unique'] = summarize(time_calls(randomizer.get_phrase, 2000 * scale))
+	return results
+
+def bench_load_list(script, lists_dir:Path, scale:int) -> dict:
+	''' Benchmarks loading lists from disk, read into memory, memory mapped and packed.
+	'''
+	results = {}
+	write_list(lists_dir / 'medium.txt', 200000, 'medium')
+	write_list(lists_dir / 'huge.txt', 1000000, 'username')
+
+	def load(list_name):
+		return lambda: script.List_Cache(lists_dir).get(list_name)
+
+	def remove_index():
+		for index_path in lists_dir.glob('*.idx'):
+			index_path.unlink()
+
+	results['load_list_memory'] = summarize(time_calls(load('medium'), 3 * scale), 'ms')
+	results['load_list_mapped_cold'] = summarize(time_calls(load('huge'), scale, remove_index), 'ms')
+	results['load_list_mapped_warm'] = summarize(time_calls(load('huge'), 3 * scale), 'ms')
+
+	# Packed lists are removed afterwards, so the other benchmarks read list files like they always have
+	results['pack_lists'] = summarize(time_calls(lambda: script.List_Cache(lists_dir).pack(), scale), 'ms')
+	results['load_list_packed'] = summarize(time_calls(load('medium'), 3 * scale), 'ms')
+	(lists_dir / script.PACKED_LISTS_FILE).unlink()
+	return results
+
+def bench_phrase_pool(script, lists_dir:Path, scale:int, phrase_count:int=100000) -> dict:
+	''' Benchmarks a large pool of phrases taken from the settings, and the same pool taken from a phrase file.
+	'''
+	phrases_dir = lists_dir.parent / 'phrases'
+	phrases_dir.mkdir(exist_ok=True)
+	phrases = [f'Phrase {index}: {{p}} and {{i}}' for index in range(phrase_count)]
+	(phrases_dir / 'pool.txt').write_text('\n'.join(phrases), encoding='utf-8')
+
+	randomizer = script.Phrase_Randomizer(lists_dir)
+	results = {
+		f'set_phrase_list_{phrase_count}': summarize(time_calls(lambda: randomizer.set_phrase_list(phrases), scale), 'ms'),
+		f'set_phrase_pool_{phrase_count}': summarize(time_calls(lambda: randomizer.set_phrase_pool(script.List_Cache(phrases_dir), 'pool'), scale), 'ms'),
+	}
+	results['get_phrase_pool'] = summarize(time_calls(randomizer.get_phrase, 2000 * scale))
+
+	# Switching from a weighted phrase file back to a short phrase list must drop the file's alias table
+	(phrases_dir / 'weighted.txt').write_text('\n'.join(f'{index % 5 + 1}|Weighted {index}' for index in range(1000)), encoding='utf-8')
+	pools = script.List_Cache(phrases_dir)
+	short_list = ['A', 'B', 'C', 'D', 'E']
+	def switch():
+		randomizer.set_phrase_pool(pools, 'weighted')
+		randomizer.set_phrase_list(short_list)
+	for phrase_duplication in (True, False):
+		randomizer.set_phrase_duplication(phrase_duplication)
+		results[f'switch_pool_to_list_{"duplicated" if phrase_duplication else "unique"}'] = summarize(time_calls(switch, 20 * scale), 'ms')
+		phrases = {randomizer.get_phrase() for _ in range(100)}
+		assert phrases <= set(short_list), phrases
+	return results
+
+def make_settings(script, lists_dir:Path, phrase_count:int):
+	''' Builds settings the way OBS would before calling script_update.
+	'''
+	settings = obs.obs_data_create()
+	script.script_defaults(settings)
+	obs.obs_data_set_string(settings, 'source', 'Phrase')
+	obs.obs_data_set_string(settings, 'lists_dir', str(lists_dir))
+	obs.obs_data_set_string(settings, 'phrases', '\n'.join(f'Phrase {index}: {{p}} and {{i}}' for index in range(phrase_count)))
+	return settings
+
+def bench_script_update(script, lists_dir:Path, scale:int) -> dict:
+	''' Benchmarks script_update with a large phrase list.
+	'''
+	settings = make_settings(script, lists_dir, 5000)
+	script.script_load(settings)
+	samples = time_calls(lambda: script.script_update(settings), 20 * scale)
+	script.script_unload()
+	return {'script_update': summarize(samples, 'ms')}
+
+def bench_spin(script, lists_dir:Path, scale:int) -> dict:
+	''' Benchmarks full spins, from the trigger to the final phrase, with OBS's timers simulated at 60 fps.
+	'''
+	settings = make_settings(script, lists_dir, 500)
+	obs.obs_data_set_int(settings, 'animation_length', 1500)
+	obs.obs_data_set_int(settings, 'phrase_lifetime', 0)
+	script.script_load(settings)
+	script.script_update(settings)
+
+	trigger_samples, first_frame_samples, jitter_samples, spin_samples = [], [], [], []
+	frame_times, end_time = script.animation_frame_times(script.Data.animation_length, script.Data.animation_deceleration)
+
+	for _ in range(2 * scale):
+		obs.calls.clear()
+
+		start = monotonic()
+		script.Data.Wheels[0].on_click_get_random_phrase()
+		trigger_samples.append(monotonic() - start)
+
+		obs.run_timers(10, until=lambda: not script.Data.Wheels[0].spinning)
+		spin_samples.append(monotonic() - start)
+
+		# Our animation starts when the source is made visible
+		updates = obs.calls_named('obs_source_update')
+		visible = next(call[0] for call in updates if call[2][1].get('opacity') == 100)
+		frames = [call[0] - visible for call in updates if 'text' in call[2][1]]
+		first_frame_samples.append(visible + frames[0] - start)
+
+		# Frames are due at their planned time, and shown on the next video frame after it
+		for actual in frames[:-1]:
+			planned = max([planned for planned in frame_times if planned / 1000 <= actual] or [0]) / 1000
+			jitter_samples.append(actual - planned)
+		jitter_samples.append(frames[-1] - end_time / 1000)
+
+	script.script_unload()
+	return {
+		'spin_trigger': summarize(trigger_samples),
+		'spin_first_frame': summarize(first_frame_samples, 'ms'),
+		'spin_frame_jitter': summarize(jitter_samples, 'ms'),
+		'spin_total': summarize(spin_samples, 'ms'),
+	}
+
+def bench_wheels(script, lists_dir:Path, scale:int, wheel_count:int=4) -> dict:
+	''' Benchmarks several wheels spinning at once. They share one scheduler, so every video frame runs a single tick for all of them.
+	'''
+	settings = make_settings(script, lists_dir, 500)
+	obs.obs_data_set_int(settings, 'animation_length', 1500)
+	obs.obs_data_set_int(settings, 'phrase_lifetime', 0)
+	obs.obs_data_set_int(settings, 'wheel_count', wheel_count)
+	for index in range(1, wheel_count):
+		obs.create_source(f'Phrase {index + 1}')
+		obs.obs_data_set_string(settings, script.Wheel.setting_key('source', index), f'Phrase {index + 1}')
+		obs.obs_data_set_string(settings, script.Wheel.setting_key('phrases', index), obs.obs_data_get_string(settings, 'phrases'))
+	script.script_load(settings)
+	script.script_update(settings)
+
+	# Timing every tick of our scheduler
+	tick_samples = []
+	scheduler_tick = script.scheduler_tick
+	def timed_tick():
+		start = perf_counter()
+		scheduler_tick()
+		tick_samples.append(perf_counter() - start)
+	script.scheduler_tick = timed_tick
+
+	spin_samples, timer_counts = [], []
+	for _ in range(2 * scale):
+		start = monotonic()
+		for wheel in script.Data.Wheels:
+			wheel.on_click_get_random_phrase()
+		timer_counts.append(len(obs.timers))
+
+		obs.run_timers(10, until=lambda: not any(wheel.spinning for wheel in script.Data.Wheels))
+		spin_samples.append(monotonic() - start)
+
+	script.scheduler_tick = scheduler_tick
+	script.script_unload()
+	return {
+		f'wheels_{wheel_count}_spin_total': summarize(spin_samples, 'ms'),
+		f'wheels_{wheel_count}_tick': summarize(tick_samples),
+		f'wheels_{wheel_count}_timers': summarize(timer_counts, 'count'),
+	}
+
+def bench_properties(script, lists_dir:Path, scale:int, source_count:int=2000) -> dict:
+	''' Benchmarks building the properties panel in a scene collection with many sources, most of them not text sources.
+	'''
+	settings = make_settings(script, lists_dir, 500)
+	names = [f'Image {index}' for index in range(source_count)]
+	for name in names:
+		obs.create_source(name, 'image_source')
+	script.script_load(settings)
+	script.script_update(settings)
+
+	samples = time_calls(script.script_properties, 50 * scale)
+
+	# Sources created, renamed and removed after the first panel are kept up to date
+	obs.create_source('Phrase late')
+	obs.rename_source('Phrase late', 'Phrase renamed')
+	source_names = [value for _, (_, value) in obs.obs_properties_get(script.script_properties(), 'source')]
+	assert 'Phrase renamed' in source_names and 'Phrase late' not in source_names, source_names
+	obs.remove_source('Phrase renamed')
+
+	script.script_unload()
+	for name in names:
+		obs.remove_source(name)
+	return {f'script_properties_{source_count}_sources': summarize(samples)}
+
+
+def bench_trigger_server(script, lists_dir:Path, scale:int, client_count:int=8) -> dict:
+	''' Benchmarks the trigger server with several local clients sending requests at once, while OBS's timers are simulated at 60 fps.
+	'''
+	settings = make_settings(script, lists_dir, 500)
+	obs.obs_data_set_bool(settings, 'trigger_server_enabled', True)
+	obs.obs_data_set_int(settings, 'trigger_server_port', 0)
+	script.script_load(settings)
+	script.script_update(settings)
+	port = script.Data.Triggers.port
+
+	def client(path, count, samples):
+		connection = HTTPConnection(script.Trigger_Server.HOST, port, timeout=10)
+		for _ in range(count):
+			start = perf_counter()
+			connection.request('GET', path)
+			response = connection.getresponse()
+			assert response.status == 200, response.read()
+			response.read()
+			samples.append(perf_counter() - start)
+		connection.close()
+
+	results = {}
+	for name, path, count in [('show', '/show', 50 * scale), ('preview_12', '/preview?count=12', 50 * scale)]:
+		samples = []
+		clients = [Thread(target=client, args=(path, count, samples)) for _ in range(client_count)]
+		start = perf_counter()
+		for thread in clients:
+			thread.start()
+		obs.run_timers(60, until=lambda: not any(thread.is_alive() for thread in clients))
+		elapsed = perf_counter() - start
+
+		assert len(samples) == client_count * count, 'Not every request was answered'
+		# Wall time divided by requests, so the server's throughput is 1 / this
+		results[f'trigger_server_{name}'] = summarize(samples, 'ms')
+		results[f'trigger_server_{name}_amortized'] = summarize([elapsed / len(samples)])
+
+	script.script_unload()
+	return results
+
+
+
+def compare(results:dict, baseline:dict, tolerance:float) -> list:
+	''' Returns a description of every result whose p50 is worse than the baseline by more than the tolerance.
+	'''
+	regressions = []
+	for name, result in results.items():
+		previous = baseline.get(name)
+		if previous and previous['unit'] == result['unit'] and result['p50'] > previous['p50'] * (1 + tolerance):
+			regressions.append(f"{name}: p50 {previous['p50']} -> {result['p50']} {result['unit']}")
+	return regressions
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description='Benchmarks phrase-randomizer.py outside of OBS.')
+	parser.add_argument('--quick', action='store_true', help='Run fewer iterations.')
+	parser.add_argument('--output', type=Path, help='Write results to this file instead of printing them.')
+	parser.add_argument('--compare', type=Path, help='Results file to compare against. Exits with 1 if anything regressed.')
+	parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown before a result counts as a regression (default 0.25).')
+	args = parser.parse_args()
+	scale = 1 if args.quick else 5
+
+	# The script prints to OBS's log, we keep that out of our results
+	with TemporaryDirectory() as temp_dir, redirect_stdout(sys.stderr):
+		lists_dir = Path(temp_dir) / 'lists'
+		lists_dir.mkdir()
+		write_list(lists_dir / 'p.txt', 50000, 'viewer')
+		write_list(lists_dir / 'i.txt', 50000, 'item')
+
+		# Recording every call would be most of what we time
+		obs.reset()
+		obs.record_calls = False
+		obs.create_source('Phrase')
+
+		script = load_script()
+		script.Data.SettingsWriter.path = Path(temp_dir) / 'settings.json'
+		script.Data.state_file = Path(temp_dir) / 'state.json'
+
+		results = {}
+		results.update(bench_randomizer(script, lists_dir, scale))
+		results.update(bench_load_list(script, lists_dir, scale))
+		results.update(bench_phrase_pool(script, lists_dir, scale))
+		results.update(bench_script_update(script, lists_dir, scale))
+		results.update(bench_properties(script, lists_dir, scale))
+
+		obs.record_calls = True
+		results.update(bench_spin(script, lists_dir, scale))
+		results.update(bench_wheels(script, lists_dir, scale))
+		results.update(bench_trigger_server(script, lists_dir, scale))
+
+	report = {
+		'python': platform.python_version(),
+		'platform': platform.platform(),
+		'numpy': script.numpy is not None,
+		'results': results,
+	}
+
+	if args.output:
+		args.output.write_text(dumps(report, indent='\t'), encoding='utf-8')
+	else:
+		print(dumps(report, indent='\t'))
+
+	if args.compare:
+		regressions = compare(results, loads(args.compare.read_text(encoding='utf-8'))['results'], args.tolerance)
+		for regression in regressions:
+			print(f'Regression: {regression}', file=sys.stderr)
+		return 1 if regressions else 0
+
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,393 @@
+'''
+A pure python stand-in for the `obspython` module OBS provides to scripts, so phrase-randomizer.py can be run and timed outside of OBS.
+
+Only what the script uses is implemented. Every call is recorded in `calls` with a monotonic timestamp, and timers are only run when `run_timers` is called, the same way OBS runs them once per video frame.
+
+Usage:
+	Put this directory first on sys.path before loading the script. See benchmark.py for an example.
+
+'''
+
+# Standard libraries
+from json import loads, dumps
+from time import monotonic, sleep
+
+
+# Constants
+########################################
+
+OBS_INVALID_HOTKEY_ID = -1
+OBS_MONITORING_TYPE_MONITOR_AND_OUTPUT = 2
+
+OBS_COMBO_TYPE_EDITABLE = 1
+OBS_COMBO_TYPE_LIST = 2
+OBS_COMBO_FORMAT_INT = 1
+OBS_COMBO_FORMAT_FLOAT = 2
+OBS_COMBO_FORMAT_STRING = 3
+
+OBS_TEXT_DEFAULT = 0
+OBS_TEXT_PASSWORD = 1
+OBS_TEXT_MULTILINE = 2
+OBS_TEXT_INFO = 3
+
+OBS_PATH_FILE = 0
+OBS_PATH_FILE_SAVE = 1
+OBS_PATH_DIRECTORY = 2
+
+OBS_GROUP_NORMAL = 1
+
+
+# Call recording
+########################################
+
+calls = []
+''' Every call made to this module, as (monotonic time, function name, arguments). '''
+
+record_calls = True
+''' Set to False to stop recording, i.e. when timing code where recording would be most of the cost. '''
+
+def _record(name:str, *args) -> None:
+	if record_calls:
+		calls.append((monotonic(), name, args))
+
+def reset() -> None:
+	''' Forgets every recorded call, timer, source and signal handler.
+	'''
+	calls.clear()
+	timers.clear()
+	sources.clear()
+	signal_handlers.clear()
+
+def calls_named(name:str) -> list:
+	''' Returns every recorded call to the function with the given name.
+
+	Arguments:
+		name(str): Name of the function, i.e. `obs_source_update`.
+	'''
+	return [call for call in calls if call[1] == name]
+
+
+# obs_data
+########################################
+
+class Data(dict):
+	''' Stand-in for obs_data_t. Defaults are kept separately, like OBS does.
+	'''
+	def __init__(self, *args, **kwargs) -> None:
+		super().__init__(*args, **kwargs)
+		self.defaults = {}
+
+	def value(self, key:str, fallback):
+		if key in self:
+			return self[key]
+		return self.defaults.get(key, fallback)
+
+def obs_data_create():
+	_record('obs_data_create')
+	return Data()
+
+def obs_data_create_from_json(json_string:str):
+	_record('obs_data_create_from_json', json_string)
+	return Data(loads(json_string))
+
+def obs_data_get_json(data) -> str:
+	_record('obs_data_get_json')
+	return dumps(dict(data.defaults, **data))
+
+def obs_data_release(data) -> None:
+	_record('obs_data_release')
+
+def obs_data_set_string(data, key:str, value:str) -> None:
+	_record('obs_data_set_string', key, value)
+	data[key] = value
+
+obs_data_set_int = obs_data_set_bool = obs_data_set_double = obs_data_set_string
+
+def obs_data_set_default_string(data, key:str, value) -> None:
+	_record('obs_data_set_default', key, value)
+	data.defaults[key] = value
+
+obs_data_set_default_int = obs_data_set_default_bool = obs_data_set_default_double = obs_data_set_default_string
+
+def obs_data_get_string(data, key:str) -> str:
+	return data.value(key, '')
+
+def obs_data_get_int(data, key:str) -> int:
+	return data.value(key, 0)
+
+def obs_data_get_double(data, key:str) -> float:
+	return data.value(key, 0.0)
+
+def obs_data_get_bool(data, key:str) -> bool:
+	return data.value(key, False)
+
+def obs_data_get_array(data, key:str):
+	return data.get(key)
+
+def obs_data_set_array(data, key:str, array) -> None:
+	data[key] = array
+
+def obs_data_array_release(array) -> None:
+	pass
+
+
+# Sources
+########################################
+
+class Source:
+	''' Stand-in for obs_source_t.
+
+	Attributes:
+		name(str): Name of the source.
+		id(str): Unversioned id of the source, i.e. `text_ft2_source`.
+		settings(dict): Settings the source has been updated with.
+		removed(bool): If the source has been removed.
+		destroyed(bool): If the source has been destroyed. Weak references to it return None.
+	'''
+	def __init__(self, name:str, source_id:str='text_ft2_source', settings=None) -> None:
+		self.name = name
+		self.id = source_id
+		self.settings = dict(settings or {})
+		self.removed = False
+		self.destroyed = False
+
+sources = {}
+''' Public sources by name. Add text sources with create_source(). '''
+
+output_channels = {}
+''' Sources set on each output channel. '''
+
+def create_source(name:str, source_id:str='text_ft2_source') -> Source:
+	''' Creates a public source, emitting `source_create`.
+
+	Arguments:
+		name(str): Name of the source.
+		source_id(str='text_ft2_source'): Unversioned id of the source.
+	'''
+	source = Source(name, source_id)
+	sources[name] = source
+	emit_signal('source_create', {'source': source})
+	return source
+
+def remove_source(name:str) -> None:
+	''' Removes and destroys a public source, emitting `source_remove` and `source_destroy`.
+
+	Arguments:
+		name(str): Name of the source.
+	'''
+	source = sources.pop(name)
+	source.removed = True
+	emit_signal('source_remove', {'source': source})
+	source.destroyed = True
+	emit_signal('source_destroy', {'source': source})
+
+def rename_source(name:str, new_name:str) -> None:
+	''' Renames a public source, emitting `source_rename`.
+
+	Arguments:
+		name(str): Current name of the source.
+		new_name(str): New name of the source.
+	'''
+	source = sources.pop(name)
+	source.name = new_name
+	sources[new_name] = source
+	emit_signal('source_rename', {'source': source, 'prev_name': name, 'new_name': new_name})
+
+def obs_get_source_by_name(name:str):
+	_record('obs_get_source_by_name', name)
+	return sources.get(name)
+
+def obs_source_release(source) -> None:
+	_record('obs_source_release')
+
+def obs_source_update(source, data) -> None:
+	_record('obs_source_update', source.name, dict(data))
+	source.settings.update(data)
+
+def obs_source_get_name(source) -> str:
+	return source.name
+
+def obs_source_get_unversioned_id(source) -> str:
+	return source.id
+
+def obs_source_removed(source) -> bool:
+	return source.removed
+
+def obs_source_get_weak_source(source):
+	return source
+
+def obs_weak_source_get_source(weak_source):
+	return None if weak_source.destroyed else weak_source
+
+def obs_weak_source_release(weak_source) -> None:
+	pass
+
+def obs_enum_sources() -> list:
+	_record('obs_enum_sources')
+	return list(sources.values())
+
+def source_list_release(source_list) -> None:
+	pass
+
+def obs_source_create_private(source_id:str, name:str, settings):
+	_record('obs_source_create_private', source_id, name)
+	return Source(name, source_id, settings)
+
+def obs_source_set_monitoring_type(source, monitoring_type:int) -> None:
+	pass
+
+def obs_set_output_source(channel:int, source) -> None:
+	_record('obs_set_output_source', channel, source.settings.get('local_file') if source else None)
+	output_channels[channel] = source
+
+def obs_source_media_restart(source) -> None:
+	_record('obs_source_media_restart', source.settings.get('local_file'))
+
+
+# Signals
+########################################
+
+signal_handlers = {}
+''' Connected callbacks by signal name. '''
+
+def obs_get_signal_handler():
+	return 'global'
+
+def signal_handler_connect(handler, signal:str, callback) -> None:
+	signal_handlers.setdefault(signal, []).append(callback)
+
+def signal_handler_disconnect(handler, signal:str, callback) -> None:
+	if callback in signal_handlers.get(signal, []):
+		signal_handlers[signal].remove(callback)
+
+def emit_signal(signal:str, calldata:dict) -> None:
+	''' Calls every callback connected to a signal.
+
+	Arguments:
+		signal(str): Name of the signal.
+		calldata(dict): Calldata passed to the callbacks.
+	'''
+	for callback in list(signal_handlers.get(signal, [])):
+		callback(calldata)
+
+def calldata_source(calldata, key:str):
+	return calldata.get(key)
+
+def calldata_string(calldata, key:str) -> str:
+	return calldata.get(key)
+
+
+# Timers
+########################################
+
+timers = {}
+''' Added timers, as callback: [interval in ms, monotonic time of the next call]. '''
+
+_current_timer = None
+
+def timer_add(callback, interval:int) -> None:
+	_record('timer_add', getattr(callback, '__name__', callback), interval)
+	timers[callback] = [interval, monotonic() + interval / 1000]
+
+def timer_remove(callback) -> None:
+	_record('timer_remove', getattr(callback, '__name__', callback))
+	timers.pop(callback, None)
+
+def remove_current_callback() -> None:
+	timer_remove(_current_timer)
+
+def run_timers(duration:float, fps:float=60, until=None) -> None:
+	''' Runs our timers like OBS does, checking them once per video frame.
+
+	Arguments:
+		duration(float): Maximum time to run for in seconds.
+		fps(float=60): Video frames per second.
+		until(callable=None): Stops early once this returns True.
+	'''
+	global _current_timer
+	frame = 1 / fps
+	next_frame = monotonic()
+	end = next_frame + duration
+
+	while monotonic() < end:
+		now = monotonic()
+		for callback, timer in list(timers.items()):
+			if callback in timers and timer[1] <= now:
+				timer[1] = now + timer[0] / 1000
+				_current_timer = callback
+				callback()
+		_current_timer = None
+
+		if until is not None and until():
+			return
+
+		next_frame += frame
+		sleep(max(0, next_frame - monotonic()))
+
+
+# Hotkeys
+########################################
+
+def obs_hotkey_register_frontend(name:str, description:str, callback) -> int:
+	_record('obs_hotkey_register_frontend', name, description)
+	return len(calls)
+
+def obs_hotkey_unregister(hotkey_id:int) -> None:
+	_record('obs_hotkey_unregister', hotkey_id)
+
+def obs_hotkey_load(hotkey_id:int, array) -> None:
+	pass
+
+def obs_hotkey_save(hotkey_id:int):
+	return None
+
+
+# Properties
+########################################
+
+class Properties(list):
+	''' Stand-in for obs_properties_t, keeping (function name, arguments) for every property added. Also used as the stand-in for obs_property_t.
+
+	Attributes:
+		by_name({str:Properties}): Every property added, keyed by name.
+		visible(bool): If the property is visible.
+	'''
+	def __init__(self) -> None:
+		super().__init__()
+		self.by_name = {}
+		self.visible = True
+
+def obs_properties_create():
+	return Properties()
+
+def obs_properties_get(props, name:str):
+	return props.by_name.get(name)
+
+def _add_property(name:str):
+	def add_property(props, *args):
+		props.append((name, args))
+		prop = props.by_name[args[0]] = Properties()
+		return prop
+	add_property.__name__ = name
+	return add_property
+
+obs_properties_add_list = _add_property('obs_properties_add_list')
+obs_properties_add_text = _add_property('obs_properties_add_text')
+obs_properties_add_button = _add_property('obs_properties_add_button')
+obs_properties_add_bool = _add_property('obs_properties_add_bool')
+obs_properties_add_int = _add_property('obs_properties_add_int')
+obs_properties_add_int_slider = _add_property('obs_properties_add_int_slider')
+obs_properties_add_path = _add_property('obs_properties_add_path')
+obs_properties_add_group = _add_property('obs_properties_add_group')
+
+def obs_property_list_add_string(prop, name:str, value:str) -> None:
+	prop.append(('obs_property_list_add_string', (name, value)))
+
+def obs_property_list_clear(prop) -> None:
+	prop.clear()
+
+def obs_property_set_modified_callback(prop, callback) -> None:
+	pass
+
+def obs_property_set_visible(prop, visible:bool) -> None:
+	prop.visible = visible
@@ -14,235 +14,2886 @@ Author: Matthew Pogue - matthewpogue606+phraseRandomizer@gmail.com
 '''
 
 # Standard libraries
+import sys
+import argparse
 from pathlib import Path
-from time import sleep
-from random import shuffle, randint, choice as random_choice
+from time import monotonic
+from heapq import heappush, heappop
+from concurrent.futures import ThreadPoolExecutor, Future
+from threading import RLock, Lock, Thread
+from queue import Queue, Empty
+from urllib.parse import urlsplit, parse_qs
+import asyncio
+from os import replace as replace_file
+from collections import deque
+from array import array
+from mmap import mmap, ACCESS_READ
+from struct import Struct, error as StructError
+from random import shuffle, sample, randrange, choices, random, expovariate, choice as random_choice
+import re
 from json import loads, dumps
+from hashlib import sha1
+
+# Optional libraries - NumPy is only used to speed up large batches of phrases
+try:
+	import numpy
+except ImportError:
+	numpy = None
 
 # OBS - This isn't on pipy, so it can't be installed. Adding the comment will remove it from pylance
-import obspython as obs # type: ignore
+try:
+	import obspython as obs # type: ignore
+except ImportError:
+	# Outside of OBS we can only be run from the command line, see main()
+	if __name__ != '__main__':
+		raise
+	obs = None
 
 # Globals
 PROJECT_NAME = 'phraseRandomizer'
 SCRIPT_DIRECTORY = Path(__file__).parent.resolve()
 SCRIPT_SETTINGS_FILE = SCRIPT_DIRECTORY / f'{PROJECT_NAME}.settings.json'
+SCRIPT_METRICS_FILE = SCRIPT_DIRECTORY / f'{PROJECT_NAME}.metrics.json'
+SCRIPT_STATE_FILE = SCRIPT_DIRECTORY / f'{PROJECT_NAME}.state.json'
+STATE_VERSION = 5 # Bump whenever what we save in SCRIPT_STATE_FILE changes
 AVAILABLE_LANGUAGES = ['en']
+MAX_WHEELS = 8 # Maximum number of wheels, each spinning on its own text source
+MAPPED_LIST_SIZE = 8 * 1024 * 1024 # List files this size or larger are memory mapped rather than read into memory
+PACKED_LISTS_FILE = 'lists.pack' # Name of the file every list in a lists directory is packed into, see Packed_Lists
+WEIGHT_PATTERN = re.compile(r'\s*(\d+(?:\.\d*)?|\.\d+)\s*\|\s*') # Optional `<weight>|` prefix of phrases and list entries
+REFERENCE_PATTERN = re.compile(r'\{([^{}:\n/\\]+)(?::[^{}\n]*)?\}') # Variables in list entries, capturing the name of the list they use. Variables with an invalid name don't use a list, see Phrase_Template
+REFERENCE_PATTERN_BYTES = re.compile(REFERENCE_PATTERN.pattern.encode()) # REFERENCE_PATTERN for lists that are still encoded, i.e. mapped lists
+BLANK_LINE_PATTERN = re.compile(rb'^[ \t\r\f\v]*$', re.MULTILINE) # Blank lines of encoded phrase files, which are dropped like blank phrases in the settings
+MAX_EXPANSION_DEPTH = 8 # How many lists deep variables in list entries are filled. Variables any deeper are left as they are, which also stops lists that use each other
+MAX_ENTRY_TEMPLATES = 65536 # Number of compiled list entries a randomizer keeps before starting over
 
 
 
-# Phrase Randomizer used to generate phrases
+# Metrics used to see where the time of a spin goes
 ########################################
 
-class Phrase_Randomizer:
-	''' A phrase randomizer used to generate random phrases from a master phrase list.
+class Rolling_Histogram:
+	''' Keeps the latest samples of a measurement, and summarizes them.
+
+	Attributes:
+		count(int): Number of samples ever added, including ones that have rolled out.
+		_samples(deque): The latest samples.
+	'''
+
+	def __init__(self, size:int=500) -> None:
+		''' Creates an empty histogram.
+
+		Arguments:
+			size(int=500): Number of samples to keep.
+		'''
+		self.count = 0
+		self._samples = deque(maxlen=size)
+
+	def add(self, value:float) -> None:
+		self.count += 1
+		self._samples.append(value)
+
+	def summary(self) -> dict:
+		''' Returns the count, p50, p95 and max of our samples.
+		'''
+		samples = sorted(self._samples)
+		if not samples:
+			return {'count': 0, 'p50': None, 'p95': None, 'max': None}
+
+		return {
+			'count': self.count,
+			'p50': round(samples[int(0.50 * (len(samples) - 1))], 3),
+			'p95': round(samples[int(0.95 * (len(samples) - 1))], 3),
+			'max': round(samples[-1], 3),
+		}
 
-	Phrases can have a code to be replaced by information from any available list.
+
+class Spin_Metrics:
+	''' Timestamps every stage of a spin with a monotonic clock, and keeps a rolling histogram for each stage in ms.
+
+	Stages marked with mark() are measured from the trigger of the current spin. Spins running at the same time, i.e. on different wheels, are told apart by a key:
+		trigger: Time the trigger spent on the OBS thread before returning.
+		first_frame: The first frame of the animation, or the final phrase if there is no animation.
+		final_frame: The final phrase of the last animation.
+		hide: The phrase being hidden after its lifetime.
+
+	Durations recorded with record() or timed():
+		phrase_generation: Time spent generating a spin, on the OBS thread or our worker.
+		list_load: Time spent loading a list from disk.
+		frame_lateness: How long after its planned time each frame was displayed.
+		sound: Time spent starting a sound.
+
+	Counted with count(), see Spin_Queue:
+		triggers_queued, triggers_coalesced, triggers_dropped, triggers_preempted: What happened to triggers that came in while a wheel was spinning.
 
 	Attributes:
-		_lists_dir(Path): Directory in which to look for lists.
-		_lists({str:[str]}: A dictionary of names to lists of strings to fill variables in phrases.
-			i.e. if a phrase contains '{p}', a string from the list in _lists['p'] replaces '{p}' in the phrase.
+		histograms({str:Rolling_Histogram}): Histograms keyed by stage.
+		counters({str:int}): Counts keyed by name.
+		_spins({:(float, set)}): Monotonic time of the trigger of the current spin and the stages already marked for it, keyed by spin.
+	'''
 
-		_phrases_master([str]): A public copy of the phrases. This isn't manipulated in the same way that _phrases is.
-		_phrases([str]): A list of strings that is the master phrases. Phrases will be removed from this list if requested.
+	STAGES = ['trigger', 'phrase_generation', 'list_load', 'first_frame', 'frame_lateness', 'final_frame', 'sound', 'hide']
 
-		_phrase_duplication(bool): Tells the class if we should remove phrases after they have been chosen.
+	def __init__(self) -> None:
+		self.histograms = {stage: Rolling_Histogram() for stage in self.STAGES}
+		self.counters = {}
+		self._spins = {}
 
-		_min_phrase_count(int=2): The minimum number of phrases that can be in the working phrase list. Once it drops below this level, the phrases will be repopulated.
+	def start_spin(self, spin=None) -> None:
+		''' Marks the trigger of a new spin. Stages are measured from here.
+
+		Arguments:
+			spin(=None): Key of the spin, i.e. the index of the wheel spinning.
+		'''
+		self._spins[spin] = (monotonic(), set())
+
+	def mark(self, stage:str, spin=None) -> None:
+		''' Records the time since the trigger of the current spin. Each stage is only recorded once per spin.
+
+		Arguments:
+			stage(str): Name of the stage.
+			spin(=None): Key of the spin, the same one given to start_spin().
+		'''
+		current = self._spins.get(spin)
+		if current is None or stage in current[1]:
+			return
+		current[1].add(stage)
+		self.record(stage, (monotonic() - current[0]) * 1000)
+
+	def record(self, stage:str, value:float) -> None:
+		''' Records a value in ms.
+
+		Arguments:
+			stage(str): Name of the stage.
+			value(float): Value in ms.
+		'''
+		self.histograms.setdefault(stage, Rolling_Histogram()).add(value)
+
+	def count(self, counter:str) -> None:
+		''' Adds one to a counter.
+
+		Arguments:
+			counter(str): Name of the counter, i.e. `triggers_dropped`.
+		'''
+		self.counters[counter] = self.counters.get(counter, 0) + 1
+
+	def timed(self, stage:str):
+		''' Returns a context manager recording how long its block took.
+
+		Arguments:
+			stage(str): Name of the stage.
+		'''
+		return _Timed_Stage(self, stage)
+
+	def summary(self) -> dict:
+		''' Returns the summary of every histogram, keyed by stage.
+		'''
+		return {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+
+	def summary_text(self) -> str:
+		''' Returns a line for every stage with samples and every counter, for displaying in the script properties.
+		'''
+		lines = []
+		for stage, summary in self.summary().items():
+			if summary['count']:
+				lines.append(f"{stage}: p50 {summary['p50']} ms, p95 {summary['p95']} ms, max {summary['max']} ms ({summary['count']})")
+		for counter, count in sorted(self.counters.items()):
+			lines.append(f'{counter}: {count}')
+		return '\n'.join(lines)
+
+	def dump(self, path:Path) -> None:
+		''' Writes our summary to a JSON file.
+
+		Arguments:
+			path(Path): File to write to.
+		'''
+		with open(path, 'w', encoding='utf-8') as metrics_file:
+			metrics_file.write(dumps(dict(self.summary(), counters=self.counters), indent='\t'))
+		print(f'Metrics written to `{path}`')
+
+
+class _Timed_Stage:
+	''' Context manager recording the duration of its block. See Spin_Metrics.timed.
 	'''
 
-	def __init__(self, list_directory:Path) -> None:
-		''' A tool for filling phrases with random information provided by list files.
+	def __init__(self, metrics:Spin_Metrics, stage:str) -> None:
+		self._metrics = metrics
+		self._stage = stage
+
+	def __enter__(self):
+		self._start = monotonic()
+		return self
+
+	def __exit__(self, _, __, ___):
+		self._metrics.record(self._stage, (monotonic() - self._start) * 1000)
+
+
+# Background worker used to keep slow work off the OBS thread
+########################################
+
+class Background_Worker:
+	''' Runs jobs one at a time on a background thread.
+
+	The thread is only started once we have a job for it, and can be started again after shutdown() (i.e. when the script is reloaded).
+
+	Attributes:
+		_executor(ThreadPoolExecutor): The executor running our jobs. None until the first job is submitted.
+	'''
+
+	def __init__(self) -> None:
+		self._executor = None
+
+	def submit(self, job, *args):
+		''' Runs a job on our background thread. Errors are printed rather than lost in the future.
 
 		Arguments:
-			list_directory: Directory to look for our lists.
+			job(callable): Function to run.
+			*args: Arguments to pass to the job.
+
+		Returns:
+			A concurrent.futures.Future for the job's result.
 		'''
-		self._lists_dir = list_directory
-		self._lists   = {}
+		if self._executor is None:
+			self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=PROJECT_NAME)
 
-		self._phrases_master = []
-		self._phrases        = self._phrases_master
+		future = self._executor.submit(job, *args)
+		future.add_done_callback(self._report)
+		return future
 
-		self._phrase_duplication = True
+	@staticmethod
+	def _report(future) -> None:
+		''' Prints the error of a failed job.
+		'''
+		if not future.cancelled() and future.exception() is not None:
+			print(future.exception(), 'Background job failed')
 
-		self._min_phrase_count = 2
+	def shutdown(self) -> None:
+		''' Stops our thread once the jobs already submitted finish, without waiting for them.
+		'''
+		if self._executor is not None:
+			self._executor.shutdown(wait=False)
+			self._executor = None
 
-	def fill_phrase(self, phrase:str) -> None:
-		''' Fills a single phrase with variables from all the lists.
+
+# Sampling helpers
+########################################
+
+_numpy_generator = None
+
+def numpy_generator():
+	''' Returns our NumPy random generator, creating it the first time. Only call this if NumPy is available.
+	'''
+	global _numpy_generator
+	if _numpy_generator is None:
+		_numpy_generator = numpy.random.default_rng()
+	return _numpy_generator
+
+def random_indices(size:int, count:int) -> list:
+	''' Draws count random indices in range(size) in one go, with replacement.
+
+	Uses NumPy when it's available, otherwise random.choices.
+
+	Arguments:
+		size(int): Number of items to choose from.
+		count(int): Number of indices to draw.
+	'''
+	if numpy is not None:
+		return numpy_generator().integers(0, size, count).tolist()
+
+	return choices(range(size), k=count)
+
+def random_position(entries) -> int:
+	''' Returns a random position in a list, following its weights if it has them.
+
+	Arguments:
+		entries([str]): A list of entries. Weighted lists have an `alias` Alias_Table.
+	'''
+	alias = getattr(entries, 'alias', None)
+	if alias is None:
+		return randrange(len(entries))
+	return alias.draw()
+
+def random_positions(entries, count:int) -> list:
+	''' Draws count random positions in a list in one go, with replacement, following its weights if it has them.
+
+	Arguments:
+		entries([str]): A list of entries. Weighted lists have an `alias` Alias_Table.
+		count(int): Number of positions to draw.
+	'''
+	alias = getattr(entries, 'alias', None)
+	if alias is None:
+		return random_indices(len(entries), count)
+	return alias.draw_batch(count)
+
+def sample_positions(entries, count:int) -> list:
+	''' Picks count distinct positions in a list, following its weights if it has them. The list must have at least count entries.
+
+	Weighted picks are drawn until they're distinct. If that keeps failing because a few entries hold most of the weight, the rest are picked uniformly.
+
+	Arguments:
+		entries([str]): A list of entries. Weighted lists have an `alias` Alias_Table.
+		count(int): Number of positions to pick.
+	'''
+	alias = getattr(entries, 'alias', None)
+	if alias is None:
+		return sample(range(len(entries)), count)
+
+	picked = {}
+	for _ in range(8 * count):
+		picked[alias.draw()] = None
+		if len(picked) == count:
+			return list(picked)
+	while len(picked) < count:
+		picked[randrange(len(entries))] = None
+	return list(picked)
+
+def split_weight(line:str) -> tuple:
+	''' Splits the optional `<weight>|` prefix off a phrase or list entry. Lines without one have a weight of 1.
+
+	A line can start with a `\\` to keep a prefix that would otherwise be read as a weight. The `\\` is dropped and the line has a weight of 1.
+
+	Arguments:
+		line(str): Line to split. i.e. `0.5|A rare phrase` gives (0.5, 'A rare phrase'), and `\\3|2 odds` gives (1.0, '3|2 odds').
+	'''
+	if line.startswith('\\') and WEIGHT_PATTERN.match(line, 1):
+		return 1.0, line[1:]
+
+	match = WEIGHT_PATTERN.match(line)
+	if match is None:
+		return 1.0, line
+	return float(match.group(1)), line[match.end():]
+
+def split_weights(lines:list) -> tuple:
+	''' Splits the weights off every line. Returns the lines without their prefix, and their weights or None if none of them had one.
+
+	Arguments:
+		lines([str]): Lines to split.
+	'''
+	# Most lists don't use weights, so we only look closer at lines that could have one
+	if '|' not in ''.join(lines):
+		return lines, None
+
+	weights, lines = zip(*map(split_weight, lines))
+	if all(weight == 1 for weight in weights):
+		return list(lines), None
+	return list(lines), weights
+
+
+class Alias_Table:
+	''' Weighted random positions in constant time, using Vose's alias method.
+
+	Every position gets a column holding its own probability, topped up by a single alias position. A draw picks a column uniformly, then flips a biased coin between the two.
+	Building the table is linear, so it's only done when the weights change.
+
+	Attributes:
+		weights((float)): Weight of every position. Tables loaded already built get theirs back from their columns, see weights.
+		probability(array): Chance of each column giving its own position rather than its alias.
+		alias(array): Alias position of each column.
+		_weights((float)): Weight of every position. None until it's needed if the table was loaded already built.
+	'''
+
+	def __init__(self, weights) -> None:
+		''' Builds the table for the given weights.
 
 		Arguments:
-			phrase(str): Phrase to fill.
-				{<list>:<num>}: where list is the name of the text file, num is the position in the list.
-				i.e. "Make {p:1} high-five {p:2}" will confirm both of those names are different given there are more than two names in the list `lists/p.txt`.
-				While "Every time {t} does something, {t} takes a shot" will result in completly random choices. They could be different, but there is a chance they could be the same. 1/n where n is the number of items in list `t.txt`
-				Lists do not have to be single characters. i.e. "Get {human} off my swamp" will look in list `lists/human.txt`.
+			weights((float)): Weight of every position. Positions with a weight of 0 are never drawn.
+
+		Raises:
+			ValueError: If a weight is negative, or every weight is 0.
 		'''
-		# phrase = r'Every time {p} gets a kill with {i}, {p} and {p:1} have to take a shot'
-		# First, lets grab the positions where our variables are
-		''' We're doing some magic here, so lets explain '''
-		# First, we're splitting phrase on left mustash. This leaves us with a list of elements, all of which (save the first) include a right mustash bracket (if the phrase is valid).
-		positions = [chunk.split('}') for chunk in phrase.split('{')]
-		# Then we're going to flatten our list. If you've never seen this method, it's great. There is no official way to do it, so have this stackoverflow link that I find ever time when looking it up https://stackoverflow.com/questions/952914/how-do-i-make-a-flat-list-out-of-a-list-of-lists
-		positions = [_ for __ in positions for _ in __]
-		# We should have a list where every odd indexed item is our fillable variables, lets grab them
-		positions = positions[1::2]
-
-		# Loading any lists that we don't have in this phrase
-		for field in [field.split(':') for field in positions]:
-			self._load_list(field[0])
-
-		# Shuffling all our lists before replacing strings
-		for value in self._lists.values():
-			shuffle(value)
-
-		# Starting with our first position:
-		for position in positions:
-			# Getting our count if it has one
-			if ':' in position:
-				list_name, index = position.split(':')
+		count = len(weights)
+		total = float(sum(weights))
+		if not count or total <= 0 or min(weights) < 0:
+			raise ValueError('Weights can not be negative, and at least one has to be above 0.')
+
+		self._weights = tuple(weights)
+		self.probability = array('d', [1.0]) * count
+		self.alias = array('I' if count < 2 ** 32 else 'Q', range(count))
+
+		# Pairing columns under the average with ones over it, until every column is exactly full
+		scaled = [weight * count / total for weight in weights]
+		small = [position for position, weight in enumerate(scaled) if weight < 1]
+		large = [position for position, weight in enumerate(scaled) if weight >= 1]
+		while small and large:
+			less, more = small.pop(), large.pop()
+			self.probability[less] = scaled[less]
+			self.alias[less] = more
+			scaled[more] += scaled[less] - 1
+			(small if scaled[more] < 1 else large).append(more)
+
+		self._numpy_tables = None
+
+	@classmethod
+	def from_tables(cls, probability:array, alias:array) -> 'Alias_Table':
+		''' Returns a table that was already built, i.e. from a Packed_Lists file.
+
+		Arguments:
+			probability(array): Probability of every column.
+			alias(array): Alias of every column.
+		'''
+		table = cls.__new__(cls)
+		table._weights = None
+		table.probability = probability
+		table.alias = alias
+		table._numpy_tables = None
+		return table
+
+	@property
+	def weights(self) -> tuple:
+		''' Weight of every position. Tables loaded already built work theirs out from their columns the first time they're needed, scaled so they add up to the number of positions.
+		'''
+		if self._weights is None:
+			weights = list(self.probability)
+			for column, probability in enumerate(self.probability):
+				if probability < 1:
+					weights[self.alias[column]] += 1 - probability
+			self._weights = tuple(weights)
+		return self._weights
+
+	def __len__(self) -> int:
+		return len(self.probability)
+
+	def draw(self) -> int:
+		''' Draws a single weighted position.
+		'''
+		column = randrange(len(self.probability))
+		return column if random() < self.probability[column] else self.alias[column]
+
+	def draw_batch(self, count:int) -> list:
+		''' Draws count weighted positions in one go, with replacement. Uses NumPy when it's available.
+
+		Arguments:
+			count(int): Number of positions to draw.
+		'''
+		if numpy is None:
+			probability, alias = self.probability, self.alias
+			return [column if random() < probability[column] else alias[column] for column in random_indices(len(probability), count)]
+
+		# Our arrays are shared with NumPy rather than copied
+		if self._numpy_tables is None:
+			self._numpy_tables = (numpy.frombuffer(self.probability, dtype=numpy.float64), numpy.frombuffer(self.alias, dtype=numpy.dtype(self.alias.typecode)))
+		probability, alias = self._numpy_tables
+		generator = numpy_generator()
+		columns = generator.integers(0, len(probability), count)
+		return numpy.where(generator.random(count) < probability[columns], columns, alias[columns]).tolist()
+
+
+# Phrase templates used by the randomizer
+########################################
+
+class Phrase_Template:
+	''' A phrase that has been parsed once into literal text and list slots.
+
+	Filling a template only has to pick a value for each slot and join the parts back together, so the phrase is never parsed again.
+
+	Attributes:
+		phrase(str): The raw phrase this template was compiled from.
+		slots([(str, int)]): A (list_name, index) pair for every variable in the phrase, in order. index is None when the variable isn't numbered.
+		list_names([str]): Unique names of the lists this phrase uses.
+		numbered({str:[int]}): Unique numbers used by the numbered slots of each list. Lists without numbered slots aren't included.
+		_parts([str]): Literal text of the phrase. Every odd index is a placeholder that gets overwritten with a slot value when rendering.
+	'''
+
+	def __init__(self, phrase:str) -> None:
+		''' Compiles a phrase into its literal text and slots.
+
+		Arguments:
+			phrase(str): Phrase to compile. See Phrase_Randomizer.fill_phrase for the variable format.
+		'''
+		self.phrase = phrase
+		self.slots = []
+
+		# Every `{` has to be closed by a single `}` before the next one, otherwise the text around stray mustashes would be read as variables
+		text, *variables = phrase.split('{')
+		if '}' in text or any(chunk.count('}') != 1 for chunk in variables):
+			raise ValueError(f'Unbalanced `{{` or `}}` in phrase `{phrase}`.')
+
+		self._parts = [text]
+		for chunk in variables:
+			chunk, _, text = chunk.partition('}')
+
+			# Getting our index if it has one
+			list_name, _, index = chunk.partition(':')
+			if not list_name or '/' in list_name or '\\' in list_name:
+				raise ValueError(f'Invalid list name in `{{{chunk}}}` of phrase `{phrase}`.')
+			if index:
+				try:
+					index = int(index)
+				except ValueError as e:
+					raise ValueError(f'Invalid index `{index}` in `{{{chunk}}}` of phrase `{phrase}`.') from e
 			else:
-				list_name, index = position, None
+				index = None
 
-			# Getting our index, and replacing with the given position if requested
-			list_len = len(self._lists[list_name])
-			if index is None:
-				index = randint(0, list_len)
-			phrase = phrase.replace(f'{{{position}}}', self._lists[list_name][int(index) % int(list_len)], 1)
-		return phrase
+			self.slots.append((list_name, index))
+			self._parts += [None, text]
 
-	def _check_len(self) -> None:
-		''' Checks if the length of our phrase list is long enough to continue.
+		self.list_names = list(dict.fromkeys(list_name for list_name, _ in self.slots))
+		self.numbered = {}
+		for list_name, index in self.slots:
+			if index is not None and index not in self.numbered.setdefault(list_name, []):
+				self.numbered[list_name].append(index)
 
-		Will raise an error if our phrase list length is long enough.
+	@classmethod
+	def literal(cls, phrase:str) -> 'Phrase_Template':
+		''' Returns a template without any slots, showing a phrase exactly as it's written. Used for phrases that fail to compile, so they can still be shown.
+
+		Arguments:
+			phrase(str): Phrase to show.
 		'''
-		if len(self._phrases_master) <= self._min_phrase_count:
-			raise ValueError(f'Phrase list must include more than {self._min_phrase_count} phrases.')
+		template = cls('')
+		template.phrase = phrase
+		template._parts = [phrase]
+		return template
+
+	def render(self, values:list) -> str:
+		''' Renders the phrase with the given slot values.
+
+		Arguments:
+			values([str]): A value for every slot, in the same order as self.slots.
+		'''
+		parts = self._parts.copy()
+		parts[1::2] = values
+		return ''.join(parts)
+
+
+# Phrase deck used to deal unique phrases
+########################################
+
+class Phrase_Deck:
+	''' A shuffled deck of phrase positions that are dealt one at a time.
 
-	def _load_list(self, list_name:str) -> None:
-		''' Loads a list from the file
+	The deck is shuffled once, and each draw just moves a cursor forward. Once the deck runs low it is reshuffled the next time we need a phrase.
 
-		Will look in the self._lists_directory for the list_name.
+	A weighted deck is shuffled so heavier phrases tend to come up sooner, by ordering every position by an exponential draw with its weight as the rate.
+	Every phrase is still dealt once per deck, except phrases with a weight of 0 which are left out.
+
+	Attributes:
+		_order([int]): Positions in the phrase list, in the order they will be dealt.
+		_cursor(int): Index in _order of the next position to deal.
+		_min_remaining(int): Once fewer than this many positions remain, the deck is reshuffled.
+		_last(int): The last position dealt. The first position of a reshuffled deck will never be this one.
+		_alias(Alias_Table): Weights of the phrases. None if they're all the same.
+		_dealt_at([int]): Index in _order of every position, used to check a weighted pick is still in the deck. None if the deck isn't weighted.
+	'''
 
-		This will also check the list cache to see if we already have it loaded
+	def __init__(self, size:int, min_remaining:int, alias:'Alias_Table'=None) -> None:
+		''' Creates a shuffled deck.
 
 		Arguments:
-			list_name(str): Name of the list to look for. i.e. `people` will look for `people.txt`. Will only load list if we don't have it in cache.
+			size(int): Number of phrases in the deck.
+			min_remaining(int): Minimum number of phrases that can be left in the deck before it gets reshuffled.
+			alias(Alias_Table=None): Weights of the phrases, if they're weighted.
+		'''
+		self._alias = alias
+		self._dealt_at = None
+		if alias is None:
+			self._order = list(range(size))
+		else:
+			self._order = [position for position in range(size) if alias.weights[position] > 0]
+		self._cursor = 0
+		self._min_remaining = min_remaining
+		self._last = None
+
+		self._shuffle()
+
+	def _shuffle(self) -> None:
+		''' Shuffles our whole deck, following our weights if we have them.
 		'''
-		# Checking if we have this list already, returning if we don't
-		if list_name in self._lists.keys():
+		if self._alias is None:
+			shuffle(self._order)
 			return
 
-		# Attempting to open our list.
-		try:
-			list_file_path = self._lists_dir / f'{list_name}.txt'
-			with open(list_file_path, 'r', encoding='utf-8') as list_file:
-				self._lists[list_name] = [line.strip() for line in list_file.readlines()]
+		weights = self._alias.weights
+		self._order.sort(key=lambda position: expovariate(weights[position]))
+		self._index_order()
 
-		# If that file doesn't exist, we let them know the file we were looking for and what directory we looked in.
-		except FileNotFoundError as e:
-			raise FileNotFoundError(f'Unable to find list `{list_file_path}`.') from e
+	def _index_order(self) -> None:
+		''' Rebuilds _dealt_at after our order changed. Only used by weighted decks.
+		'''
+		self._dealt_at = [-1] * len(self._alias)
+		for index, position in enumerate(self._order):
+			self._dealt_at[position] = index
 
-	def get_dummy_phrases(self, count:int=1, filled:bool=True) -> list:
-		''' Return a list of random filled phrases.
+	def get_state(self) -> tuple:
+		''' Returns a copy of the deck as plain values, so it can be saved and restored with restore_state().
+		'''
+		return (list(self._order), self._cursor, self._last)
 
-		This will not remove phrases even if the setting is on. You must use get_filled_phrase for that.
+	def restore_state(self, state:tuple) -> None:
+		''' Restores the deck from get_state(). Ignored if it was a deck of a different size.
 
 		Arguments:
-			count(int=1): Number of phrases to generate
-			filled(bool=True): If true, returns phrases that are filled. Otherwise, it returns the raw phrases.
+			state(tuple): State from get_state().
+		'''
+		order, cursor, last = state
+		if len(order) == len(self._order):
+			self._order, self._cursor, self._last = list(order), cursor, last
+			if self._alias is not None:
+				self._index_order()
+
+	@property
+	def remaining(self) -> int:
+		''' Number of positions left to deal before the deck is exhausted.
+		'''
+		return len(self._order) - self._cursor
 
-		Returns:
-			List of generated phrases
+	def _refill(self) -> None:
+		''' Reshuffles the deck if it is running low.
+
+		Makes sure the last position dealt from the old deck isn't the first position of the new one.
 		'''
-		# Checking min phrase count
-		self._check_len()
+		if self.remaining >= self._min_remaining:
+			return
 
-		# If we're not filling the phrases, we can just use a list comp to gather a adiquitly randomized list of unfilled phrases
-		if not filled:
-			return [random_choice(self._phrases) for _ in range(count)]
+		self._shuffle()
+		self._cursor = 0
+		if len(self._order) > 1 and self._order[0] == self._last:
+			swap = randrange(1, len(self._order))
+			self._order[0], self._order[swap] = self._order[swap], self._order[0]
+			if self._dealt_at is not None:
+				self._dealt_at[self._order[0]], self._dealt_at[self._order[swap]] = 0, swap
 
-		# Iterating 'count' times and filling that many phrases
-		phrases = []
-		for _ in range(count):
-			filled_phrase = self.fill_phrase(random_choice(self._phrases))
-			phrases.append(filled_phrase)
+	def draw(self) -> int:
+		''' Deals the next position from the deck.
+		'''
+		self._refill()
+		self._last = self._order[self._cursor]
+		self._cursor += 1
+		return self._last
 
-		return phrases
+	def put_back(self, position:int) -> None:
+		''' Puts a dealt position back on top of the deck, so it's the next one dealt. Positions that haven't been dealt since the deck was last shuffled are left where they are.
 
-	def get_phrase(self, filled:bool=True) -> str:
-		''' Return a single phrase that has been populated with list information.
+		Arguments:
+			position(int): Position to put back.
+		'''
+		if self._dealt_at is not None:
+			index = self._dealt_at[position]
+		else:
+			try:
+				index = self._order.index(position, 0, self._cursor)
+			except ValueError:
+				return
+		if not 0 <= index < self._cursor:
+			return
+
+		# Swapping it with the last position dealt, then un-dealing that one
+		self._cursor -= 1
+		order, top = self._order, self._cursor
+		order[index], order[top] = order[top], order[index]
+		if self._dealt_at is not None:
+			self._dealt_at[order[index]], self._dealt_at[order[top]] = index, top
 
-		Will remove phrase from working phrase list if setting is on.
+	def peek_random(self) -> int:
+		''' Returns a random position that is still in the deck without dealing it, following our weights if we have them.
+		'''
+		return self.peek_random_batch(1)[0]
+
+	def peek_random_batch(self, count:int) -> list:
+		''' Returns count random positions that are still in the deck without dealing them. Positions can be repeated.
+
+		Weighted positions are drawn from our alias table, redrawing any that were already dealt. The few that still miss after that are picked uniformly from the deck.
 
 		Arguments:
-			filled(bool=True): If true, returns phrases that are filled. Otherwise, it returns the raw phrases.
+			count(int): Number of positions to return.
 		'''
-		# Checking min phrase count
-		self._check_len()
+		self._refill()
+		order, cursor = self._order, self._cursor
 
-		shuffle(self._phrases)
-		phrase = self.fill_phrase(self._phrases[0]) if filled else self._phrases[0]
+		positions = []
+		if self._alias is not None:
+			dealt_at = self._dealt_at
+			for _ in range(4):
+				positions += [position for position in self._alias.draw_batch(count - len(positions)) if dealt_at[position] >= cursor]
+				if len(positions) == count:
+					return positions
 
-		# Removing phrase if requested
-		if self._phrase_duplication is False:
-			print('removing a phrase')
-			del self._phrases[0]
-			# Checking if our phrases are running low and repopulating if needed
-			if len(self._phrases) < self._min_phrase_count:
-				self.update_phrases()
+		return positions + [order[cursor + index] for index in random_indices(self.remaining, count - len(positions))]
 
-		# Returning our phrase
-		print(f'Current phrases:\n{self._phrases}')
-		return phrase
 
-	def set_phrase_list(self, phrase_list:list) -> None:
-		''' Updates the randomizers' copy of the phrase list.
+# List cache used to load lists for the randomizer
+########################################
 
-		If the length of this is the same or less than our _min_phrase_count, then this will throw a value error.
+class Mapped_List:
+	''' A list file that is memory mapped rather than read into memory, for lists too large to keep as python strings.
+
+	Lines are found through an index of their offsets in the file. The index is saved next to the list as `<list>.txt.idx` so it only has to be built once per change to the file.
+	Getting an entry is one offset lookup plus decoding that line, so this can be used anywhere a list of strings is.
+	Weights would need every line read, so entries are drawn uniformly. Packing the list keeps its weights, see Packed_Lists.
+	Phrase files are mapped the same way, except blank lines are left out of the index and a literal `\\n` in a line becomes a line break, see phrase_lines.
+	The file stays mapped for as long as the list is loaded. On Windows a mapped file can't be saved over, so large lists can only be edited while the script isn't loaded.
+
+	Attributes:
+		path(Path): Path of the list file.
+		phrases(bool): If the file holds phrases rather than list entries.
+		_offsets(array): Offset of the start of every line, followed by the size of the file. Blank lines of phrase files are left out, so they're stripped off the end of the line before them.
+		_map(mmap): The memory mapped file. None if the file is empty, as empty files can't be mapped.
+	'''
+
+	# Magic, version, offset typecode, file mtime_ns, file size, line count
+	INDEX_HEADER = Struct('<4sBcqqQ')
+	INDEX_MAGIC = b'PRIX'
+	PHRASE_INDEX_MAGIC = b'PRIP'
+	INDEX_VERSION = 1
+
+	def __init__(self, path:Path, stat, phrases:bool=False) -> None:
+		''' Maps a list file, loading its index from the sidecar if it is still valid and building it otherwise.
 
 		Arguments:
-			phrase_list(list:str): A list of phrases from the user.
+			path(Path): Path of the list file.
+			stat(os.stat_result): Stats of the list file, used to check the sidecar is still valid.
+			phrases(bool=False): If the file holds phrases rather than list entries.
 		'''
-		self._phrases_master = phrase_list
+		self.path = Path(path)
+		self.phrases = phrases
+		self._index_magic = self.PHRASE_INDEX_MAGIC if phrases else self.INDEX_MAGIC
 
-		# Now we need to update our working phrase lists
-		self.update_phrases()
+		with open(self.path, 'rb') as list_file:
+			self._map = mmap(list_file.fileno(), 0, access=ACCESS_READ) if stat.st_size else None
 
-	def set_lists_dir(self, lists_dir:Path) -> None:
-		''' Updates the path in whci to search for lists.
+		self._offsets = self._load_index(stat)
+		if self._offsets is None:
+			self._offsets = self._build_index(stat)
 
-		Arguments:
-			lists_dir(Path): The directory in which to search for our lists. They should be immediate children of this directory.
+	@property
+	def index_path(self) -> Path:
+		''' Path of our sidecar index file.
 		'''
-		print(f'setting our new lists directory to `{Data.lists_dir}')
-		self._lists_dir = Path(lists_dir).resolve()
+		return self.path.with_name(self.path.name + '.idx')
 
-	def clear_list_cache(self) -> None:
-		''' Forces a clear of the list cache. Useful if you've updated a list while the script has been launched and seen the list.
+	def _load_index(self, stat):
+		''' Returns the offsets saved in our sidecar, or None if there isn't a sidecar for this version of the file.
 		'''
-		self._lists = {}
+		try:
+			with open(self.index_path, 'rb') as index_file:
+				header = index_file.read(self.INDEX_HEADER.size)
+				magic, version, typecode, mtime_ns, size, count = self.INDEX_HEADER.unpack(header)
+				if (magic, version, mtime_ns, size) != (self._index_magic, self.INDEX_VERSION, stat.st_mtime_ns, stat.st_size):
+					return None
+
+				offsets = array(typecode.decode())
+				offsets.fromfile(index_file, count + 1)
+				return offsets
+
+		except (OSError, ValueError, EOFError, StructError) as e:
+			# A missing or broken sidecar just means we build the index again
+			if self.index_path.exists():
+				print(e, f'Unable to read list index `{self.index_path}`')
+			return None
+
+	def _build_index(self, stat) -> array:
+		''' Finds the offset of every line in our file and saves them to our sidecar.
+		'''
+		print(f'Indexing list `{self.path}`')
+		offsets = array('I' if stat.st_size < 2 ** 32 else 'Q', [0])
+
+		if self._map is not None:
+			find = self._map.find
+			position = find(b'\n')
+			while position != -1:
+				offsets.append(position + 1)
+				position = find(b'\n', position + 1)
+
+		# The last line doesn't need a trailing line break
+		if offsets[-1] != stat.st_size:
+			offsets.append(stat.st_size)
+
+		# Leaving blank lines out of phrase files
+		if self.phrases and self._map is not None:
+			blank = {match.start() for match in BLANK_LINE_PATTERN.finditer(self._map) if match.start() < stat.st_size}
+			if blank:
+				offsets = array(offsets.typecode, [offset for offset in offsets[:-1] if offset not in blank] + [offsets[-1]])
+
+		# Saving our index through a temporary file, so a crash or a full disk never leaves a partial sidecar. If we can't save it we just keep it in memory.
+		temp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+		try:
+			with open(temp_path, 'wb') as index_file:
+				index_file.write(self.INDEX_HEADER.pack(self._index_magic, self.INDEX_VERSION, offsets.typecode.encode(), stat.st_mtime_ns, stat.st_size, len(offsets) - 1))
+				offsets.tofile(index_file)
+			replace_file(temp_path, self.index_path)
+		except OSError as e:
+			print(e, f'Unable to save list index `{self.index_path}`')
 
-	def set_phrase_duplication(self, phrase_duplication:bool=True) -> None:
-		''' Configures the randomizer to give duplicated phrases. If this is set to false, an internal list of phrases are used to remove phrases from.
+		return offsets
+
+	def __len__(self) -> int:
+		return len(self._offsets) - 1
+
+	def __getitem__(self, index:int) -> str:
+		''' Returns a single stripped line, the same as it would be in a list read into memory.
+
+		Arguments:
+			index(int): Index of the line.
 		'''
-		print(f'Updating phrase duplication to {phrase_duplication}')
-		self._phrase_duplication = phrase_duplication
+		if index < 0:
+			index += len(self)
+		if not 0 <= index < len(self):
+			raise IndexError('list index out of range')
+
+		entry = self._map[self._offsets[index]:self._offsets[index + 1]].decode('utf-8', errors='replace').strip()
+
+		# Our entries are drawn uniformly, but weights are still taken off so they never show up in a phrase
+		if '|' in entry:
+			entry = split_weight(entry)[1]
+		if self.phrases:
+			entry = entry.replace('\\n', '\n')
+		return entry
+
+	def references(self) -> tuple:
+		''' Returns the names of the lists used by variables in our entries, searching our file without decoding it. See list_references.
+		'''
+		if self._map is None or self._map.find(b'{') == -1:
+			return ()
+		return tuple(dict.fromkeys(name.decode('utf-8', errors='replace') for name in REFERENCE_PATTERN_BYTES.findall(self._map)))
+
+
+def phrase_lines(lines:list) -> list:
+	''' Returns the stripped lines of a phrase file as phrases, the same way phrases in the settings are read: blank lines are dropped, and a literal `\\n` becomes a line break.
+
+	Arguments:
+		lines([str]): Stripped lines of the phrase file.
+	'''
+	return [line.replace('\\n', '\n') for line in lines if line]
+
+def weighted_list(lines:list, list_file_path:Path) -> list:
+	''' Returns the entries of a list read into memory, as a Weighted_List if any of its lines have a weight.
+
+	Arguments:
+		lines([str]): Stripped lines of the list.
+		list_file_path(Path): Path of the list, used to report bad weights.
+	'''
+	entries, weights = split_weights(lines)
+	if weights is None:
+		return entries
+
+	try:
+		return Weighted_List(entries, Alias_Table(weights))
+	except ValueError as e:
+		print(e, f'Ignoring the weights of list `{list_file_path}`')
+		return entries
+
+
+class Weighted_List(list):
+	''' A list read into memory whose entries have weights. Used anywhere a list of strings is, random picks just go through its alias table.
+
+	Attributes:
+		alias(Alias_Table): Weights of the entries.
+	'''
+
+	def __init__(self, entries:list, alias:Alias_Table) -> None:
+		super().__init__(entries)
+		self.alias = alias
+
+
+class Packed_List:
+	''' A single list inside a Packed_Lists file. Entries are only decoded when they're read, so this can be used anywhere a list of strings is.
+
+	Attributes:
+		alias(Alias_Table): Weights of the entries, built when the list was packed. None if the list isn't weighted.
+		_map(mmap): The memory mapped pack file.
+		_position(int): Position in the pack file of this list's entries.
+		_offsets(array): Offset of the start of every entry from _position, followed by the size of all the entries.
+	'''
+
+	def __init__(self, pack_map:mmap, position:int, offsets:array, alias:Alias_Table=None) -> None:
+		self.alias = alias
+		self._map = pack_map
+		self._position = position
+		self._offsets = offsets
+
+	def __len__(self) -> int:
+		return len(self._offsets) - 1
+
+	def __getitem__(self, index:int) -> str:
+		''' Returns a single entry, the same as it would be in a list read into memory.
+
+		Arguments:
+			index(int): Index of the entry.
+		'''
+		if index < 0:
+			index += len(self)
+		if not 0 <= index < len(self):
+			raise IndexError('list index out of range')
+
+		return self._map[self._position + self._offsets[index]:self._position + self._offsets[index + 1]].decode('utf-8')
+
+	def references(self) -> tuple:
+		''' Returns the names of the lists used by variables in our entries, searching the pack without decoding it. See list_references.
+		'''
+		start, end = self._position, self._position + self._offsets[-1]
+		if self._map.find(b'{', start, end) == -1:
+			return ()
+		return tuple(dict.fromkeys(name.decode('utf-8', errors='replace') for name in REFERENCE_PATTERN_BYTES.findall(self._map, start, end)))
+
+
+class Packed_Lists:
+	''' Every list in a lists directory packed into a single memory mapped file, so loading a list doesn't read or decode anything.
+
+	The file starts with a table of lists. Each one has the mtime_ns and size of the file it was packed from, so a list whose file changed since can be ignored.
+	The table is followed by an offset table for each list, then the alias tables of weighted lists, then every list's entries as stripped UTF-8 without line breaks or weights.
+	A directory of phrase files is packed as phrases, with the blank lines dropped and literal `\\n` turned into line breaks, see phrase_lines. Its header says so, so it's never used for lists or the other way around.
+
+	Attributes:
+		path(Path): Path of the pack file.
+		stat((int, int)): (mtime_ns, size) of the pack file when it was opened.
+		phrases(bool): If the pack holds phrase files rather than lists.
+		_map(mmap): The memory mapped pack file.
+		_lists({str:((int, int), Packed_List)}): Stats of the source file and the packed list, keyed by list name.
+	'''
+
+	# Magic, version, flags, list count
+	HEADER = Struct('<4sBBxxI')
+	# Source mtime_ns, source size, entry count, offset table position, alias table position (0 if not weighted), entries position, offset typecode, name size
+	LIST_HEADER = Struct('<qQQQQQcxH')
+	MAGIC = b'PRPK'
+	VERSION = 3
+	PHRASES_FLAG = 1
+
+	def __init__(self, path:Path, stat) -> None:
+		''' Maps a pack file and reads its table of lists.
+
+		Arguments:
+			path(Path): Path of the pack file.
+			stat(os.stat_result): Stats of the pack file.
+
+		Raises:
+			ValueError: If the file isn't a pack, or was packed by a different version of the script.
+		'''
+		self.path = Path(path)
+		self.stat = (stat.st_mtime_ns, stat.st_size)
+		self._lists = {}
+
+		if not stat.st_size:
+			raise ValueError(f'List pack `{self.path}` is empty')
+		with open(self.path, 'rb') as pack_file:
+			self._map = mmap(pack_file.fileno(), 0, access=ACCESS_READ)
+
+		magic, version, flags, count = self.HEADER.unpack_from(self._map, 0)
+		if (magic, version) != (self.MAGIC, self.VERSION):
+			raise ValueError(f'`{self.path}` is not a version {self.VERSION} list pack')
+		self.phrases = bool(flags & self.PHRASES_FLAG)
+
+		position = self.HEADER.size
+		for _ in range(count):
+			mtime_ns, size, entry_count, offsets_position, alias_position, entries_position, typecode, name_size = self.LIST_HEADER.unpack_from(self._map, position)
+			position += self.LIST_HEADER.size
+			list_name = self._map[position:position + name_size].decode('utf-8')
+			position += name_size
+
+			offsets = array(typecode.decode())
+			offsets.frombytes(self._map[offsets_position:offsets_position + (entry_count + 1) * offsets.itemsize])
+
+			alias = None
+			if alias_position:
+				probability = array('d')
+				probability.frombytes(self._map[alias_position:alias_position + entry_count * probability.itemsize])
+				alias_position += entry_count * probability.itemsize
+				aliases = array('I' if entry_count < 2 ** 32 else 'Q')
+				aliases.frombytes(self._map[alias_position:alias_position + entry_count * aliases.itemsize])
+				alias = Alias_Table.from_tables(probability, aliases)
+
+			self._lists[list_name] = ((mtime_ns, size), Packed_List(self._map, entries_position, offsets, alias))
+
+	def __len__(self) -> int:
+		return len(self._lists)
+
+	def get(self, list_name:str, stat):
+		''' Returns a packed list, or None if it isn't in the pack or its file has changed since it was packed.
+
+		Arguments:
+			list_name(str): Name of the list.
+			stat(os.stat_result): Current stats of the list's file.
+		'''
+		packed = self._lists.get(list_name)
+		if packed is None or packed[0] != (stat.st_mtime_ns, stat.st_size):
+			return None
+		return packed[1]
+
+	@classmethod
+	def write(cls, lists_dir:Path, path:Path, phrases:bool=False) -> int:
+		''' Packs every `.txt` list in a directory into a pack file. Returns the number of lists packed.
+
+		Arguments:
+			lists_dir(Path): Directory of the lists to pack.
+			path(Path): Path of the pack file to write.
+			phrases(bool=False): If the directory holds phrase files rather than lists.
+		'''
+		lists = []
+		for list_file_path in sorted(Path(lists_dir).glob('*.txt')):
+			# Getting our stats first, so a change while we read makes the packed list stale rather than wrong
+			stat = list_file_path.stat()
+			with open(list_file_path, 'r', encoding='utf-8') as list_file:
+				entries = [line.strip() for line in list_file]
+			if phrases:
+				entries = phrase_lines(entries)
+
+			# Weighted lists get their alias table built once, here
+			entries, weights = split_weights(entries)
+			alias = None
+			if weights is not None:
+				try:
+					alias = Alias_Table(weights)
+				except ValueError as e:
+					print(e, f'Ignoring the weights of list `{list_file_path}`')
+			entries = [entry.encode('utf-8') for entry in entries]
+
+			offsets = array('Q', [0])
+			for entry in entries:
+				offsets.append(offsets[-1] + len(entry))
+			if offsets[-1] < 2 ** 32:
+				offsets = array('I', offsets)
+
+			lists.append((list_file_path.stem.encode('utf-8'), stat, offsets, alias, entries))
+
+		# Laying out our table, then our offset tables, then our alias tables, then our entries
+		position = cls.HEADER.size + sum(cls.LIST_HEADER.size + len(list_name) for list_name, _, _, _, _ in lists)
+		offsets_positions = []
+		for _, _, offsets, _, _ in lists:
+			offsets_positions.append(position)
+			position += len(offsets) * offsets.itemsize
+		alias_positions = []
+		for _, _, _, alias, _ in lists:
+			alias_positions.append(0 if alias is None else position)
+			if alias is not None:
+				position += len(alias.probability) * alias.probability.itemsize + len(alias.alias) * alias.alias.itemsize
+		entries_positions = []
+		for _, _, offsets, _, _ in lists:
+			entries_positions.append(position)
+			position += offsets[-1]
+
+		with open(path, 'wb') as pack_file:
+			pack_file.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, cls.PHRASES_FLAG if phrases else 0, len(lists)))
+			for (list_name, stat, offsets, _, entries), offsets_position, alias_position, entries_position in zip(lists, offsets_positions, alias_positions, entries_positions):
+				pack_file.write(cls.LIST_HEADER.pack(stat.st_mtime_ns, stat.st_size, len(entries), offsets_position, alias_position, entries_position, offsets.typecode.encode(), len(list_name)))
+				pack_file.write(list_name)
+			for _, _, offsets, _, _ in lists:
+				offsets.tofile(pack_file)
+			for _, _, _, alias, _ in lists:
+				if alias is not None:
+					alias.probability.tofile(pack_file)
+					alias.alias.tofile(pack_file)
+			for _, _, _, _, entries in lists:
+				pack_file.writelines(entries)
+
+		return len(lists)
+
+
+def list_references(entries) -> tuple:
+	''' Returns the names of the lists used by variables in a list's entries, in the order they're first used. i.e. an entry `{adjective} {gun}` uses `adjective` and `gun`.
+
+	Arguments:
+		entries([str]|Mapped_List|Packed_List): Entries of the list. Mapped and packed lists are searched without decoding them.
+	'''
+	references = getattr(entries, 'references', None)
+	if references is not None:
+		return references()
+
+	text = '\n'.join(entries)
+	if '{' not in text:
+		return ()
+	return tuple(dict.fromkeys(REFERENCE_PATTERN.findall(text)))
+
+def find_cycles(graph:dict) -> list:
+	''' Returns the cycles in a graph of lists, i.e. `[a, b, a]` when entries of `a` use `b` and entries of `b` use `a`.
+
+	Arguments:
+		graph({str:(str)}): Names of the lists used by each list, see List_Cache.expansion_graph.
+	'''
+	cycles, done, path = [], set(), []
+
+	def visit(list_name):
+		path.append(list_name)
+		for reference in graph.get(list_name, ()):
+			if reference in path:
+				cycles.append(path[path.index(reference):] + [reference])
+			elif reference not in done:
+				visit(reference)
+		path.pop()
+		done.add(list_name)
+
+	for list_name in graph:
+		if list_name not in done:
+			visit(list_name)
+	return cycles
+
+
+class List_Cache:
+	''' Lists loaded from the files in a directory, kept up to date with those files.
+
+	Lists are taken from the directory's PACKED_LISTS_FILE if it has one and the list's file hasn't changed since it was packed.
+	Otherwise they're read into memory, unless their file is at least MAPPED_LIST_SIZE, in which case they are memory mapped with Mapped_List.
+
+	Every list remembers the modification time and size of its file. At most once every check_interval, using a list checks its file on our background worker.
+	A list whose file changed is reloaded there and swapped in as a whole, so the OBS thread never waits on a file that isn't new and only the changed list is read again.
+	Lists that couldn't be found are remembered too, and only looked for again on our worker at most once every check_interval.
+
+	When a list is loaded, we also find the lists used by variables in its entries. Together they make the expansion graph used to fill nested variables, see expansion_graph.
+
+	A cache of phrase files reads its files as phrases, see phrase_lines. Its lists never have blank entries.
+
+	Attributes:
+		lists_dir(Path): Directory in which to look for lists.
+		check_interval(float): Minimum time in seconds between checks of a list's file.
+		phrases(bool): If our files hold phrases rather than list entries.
+		_worker(Background_Worker): Worker used to check and reload lists. If this is None, lists are checked and reloaded on the calling thread.
+		_lists({str:[str]|Mapped_List|Packed_List}): Loaded lists keyed by name.
+		_stats({str:(int, int)}): (mtime_ns, size) of each list's file when it was loaded.
+		_checked({str:float}): Monotonic time each list's file was last checked.
+		_missing({str:float}): Monotonic time each list we couldn't find was last looked for.
+		_references({str:(str)}): Names of the lists used by variables in the entries of each list, see list_references.
+		_pack(Packed_Lists): Our directory's packed lists. None until a list is loaded from it.
+	'''
+
+	def __init__(self, lists_dir:Path, worker:Background_Worker=None, check_interval:float=2, phrases:bool=False) -> None:
+		self.lists_dir = lists_dir
+		self.check_interval = check_interval
+		self.phrases = phrases
+		self._worker = worker
+
+		self._lists = {}
+		self._stats = {}
+		self._checked = {}
+		self._missing = {}
+		self._references = {}
+		self._pack = None
+
+	def get(self, list_name:str) -> list:
+		''' Returns a list, loading it if we haven't seen it before.
+
+		If it's time to check the list's file, a check is started in the background and the list we have is returned right away.
+
+		Arguments:
+			list_name(str): Name of the list to look for. i.e. `people` will look for `people.txt`.
+
+		Raises:
+			FileNotFoundError: If the list's file doesn't exist. Once a list couldn't be found, this is raised without looking for the file again until the next check.
+		'''
+		entries = self._lists.get(list_name)
+		if entries is None and list_name not in self._missing:
+			return self._load(list_name)
+
+		# Checking our file if we haven't recently
+		now = monotonic()
+		checked = self._checked if entries is not None else self._missing
+		if now - checked.get(list_name, 0) >= self.check_interval:
+			checked[list_name] = now
+			if self._worker is None:
+				self._revalidate(list_name)
+			else:
+				self._worker.submit(self._revalidate, list_name)
+
+		if entries is None:
+			raise FileNotFoundError(f'Unable to find list `{self._path(list_name)}`.')
+		return entries
+
+	def preload(self, list_names:list) -> None:
+		''' Loads every list we haven't loaded yet on our background worker, so they're ready before they're used.
+
+		Arguments:
+			list_names([str]): Names of the lists to load.
+		'''
+		if self._worker is None:
+			self._preload(list_names)
+		else:
+			self._worker.submit(self._preload, list_names)
+
+	def _preload(self, list_names:list) -> None:
+		''' Loads every list we haven't loaded or looked for yet, along with every list used by their entries. Lists that can't be found are remembered as missing.
+
+		Arguments:
+			list_names([str]): Names of the lists to load.
+		'''
+		pending, seen = list(list_names), set()
+		while pending:
+			list_name = pending.pop()
+			if list_name in seen:
+				continue
+			seen.add(list_name)
+
+			if list_name not in self._lists and list_name not in self._missing:
+				try:
+					self._load(list_name)
+				except FileNotFoundError:
+					pass
+				except (OSError, ValueError, StructError) as e:
+					print(e, f'Unable to load list `{list_name}`')
+
+			pending.extend(self._references.get(list_name, ()))
+
+	def version(self, list_name:str) -> tuple:
+		''' Returns the (mtime_ns, size) of a list's file when we loaded it, or None if we haven't loaded it.
+
+		Arguments:
+			list_name(str): Name of the list.
+		'''
+		return self._stats.get(list_name)
+
+	def references(self, list_name:str) -> tuple:
+		''' Returns the names of the lists used by variables in a list's entries. Lists we haven't loaded don't use any.
+
+		Arguments:
+			list_name(str): Name of the list.
+		'''
+		return self._references.get(list_name, ())
+
+	def expansion_graph(self, list_names:list) -> dict:
+		''' Returns every list that can be reached from list_names through variables in their entries, with the names of the lists each one uses.
+
+		Arguments:
+			list_names([str]): Names of the lists to start from, i.e. the lists used by a phrase.
+
+		Returns:
+			{str:(str)}: Names of the lists used by each list. Lists we haven't loaded don't use any.
+		'''
+		graph = {}
+		pending = list(list_names)
+		while pending:
+			list_name = pending.pop()
+			if list_name not in graph:
+				graph[list_name] = self._references.get(list_name, ())
+				pending.extend(graph[list_name])
+		return graph
+
+	def missing(self, list_name:str) -> bool:
+		''' Returns if a list's file couldn't be found the last time we looked for it. Never touches the file system, so lists we haven't looked for yet (i.e. still being preloaded) aren't missing.
+
+		Arguments:
+			list_name(str): Name of the list.
+		'''
+		return list_name in self._missing
+
+	def empty(self, list_name:str) -> bool:
+		''' Returns if a list we've loaded has no entries. Lists we haven't loaded aren't looked for.
+
+		Arguments:
+			list_name(str): Name of the list.
+		'''
+		entries = self._lists.get(list_name)
+		return entries is not None and len(entries) == 0
+
+	def _path(self, list_name:str) -> Path:
+		''' Returns the path of the file for a list.
+		'''
+		return Path(self.lists_dir) / f'{list_name}.txt'
+
+	def _load(self, list_name:str) -> list:
+		''' Reads a list from its file and swaps it into the cache.
+
+		Arguments:
+			list_name(str): Name of the list to load.
+		'''
+		list_file_path = self._path(list_name)
+
+		# Attempting to open our list. Getting our stats first, so a change while we read is picked up by the next check.
+		try:
+			stat = list_file_path.stat()
+
+			# Packed lists are used as long as they're up to date. Otherwise large lists are mapped instead of being held in memory.
+			with Data.Metrics.timed('list_load'):
+				packed = self._packed()
+				entries = None if packed is None else packed.get(list_name, stat)
+				if entries is not None:
+					pass
+				elif stat.st_size >= MAPPED_LIST_SIZE:
+					entries = Mapped_List(list_file_path, stat, self.phrases)
+				else:
+					with open(list_file_path, 'r', encoding='utf-8') as list_file:
+						lines = [line.strip() for line in list_file.readlines()]
+					entries = weighted_list(phrase_lines(lines) if self.phrases else lines, list_file_path)
+
+		# If that file doesn't exist, we let them know the file we were looking for and what directory we looked in.
+		except FileNotFoundError as e:
+			self._missing.setdefault(list_name, monotonic())
+			raise FileNotFoundError(f'Unable to find list `{list_file_path}`.') from e
+
+		self._missing.pop(list_name, None)
+		self._references[list_name] = list_references(entries)
+		self._stats[list_name] = (stat.st_mtime_ns, stat.st_size)
+		self._checked[list_name] = monotonic()
+		self._lists[list_name] = entries
+		return entries
+
+	def _packed(self):
+		''' Returns our directory's packed lists, opening them again if the pack file changed. Returns None if there isn't a usable pack, including a pack of lists when we hold phrases and the other way around.
+		'''
+		pack_path = Path(self.lists_dir) / PACKED_LISTS_FILE
+		try:
+			stat = pack_path.stat()
+		except OSError:
+			self._pack = None
+			return None
+
+		if self._pack is None or self._pack.stat != (stat.st_mtime_ns, stat.st_size):
+			try:
+				self._pack = Packed_Lists(pack_path, stat)
+			except (OSError, ValueError, StructError) as e:
+				print(e, f'Unable to read list pack `{pack_path}`, using list files instead')
+				self._pack = None
+
+		if self._pack is not None and self._pack.phrases != self.phrases:
+			return None
+		return self._pack
+
+	def pack(self) -> Path:
+		''' Packs every list in our directory into its PACKED_LISTS_FILE. Lists are loaded from the new pack from then on.
+
+		Every loaded list is forgotten, so use preload() afterwards for the lists that are about to be used.
+		'''
+		pack_path = Path(self.lists_dir) / PACKED_LISTS_FILE
+		temp_path = pack_path.with_name(pack_path.name + '.tmp')
+		count = Packed_Lists.write(self.lists_dir, temp_path, self.phrases)
+
+		# Letting go of the old pack first, as a mapped file can't be replaced on Windows
+		self.clear()
+		replace_file(temp_path, pack_path)
+		print(f'Packed {count} lists into `{pack_path}`')
+		return pack_path
+
+	def _revalidate(self, list_name:str) -> None:
+		''' Reloads a list if its file has changed since we loaded it, or if it has shown up since we couldn't find it. If the file is gone, we keep what we have.
+
+		Arguments:
+			list_name(str): Name of the list to check.
+		'''
+		try:
+			stat = self._path(list_name).stat()
+		except OSError:
+			return
+
+		if list_name in self._missing:
+			print(f'List `{list_name}` found, loading it')
+			self._load(list_name)
+			return
+
+		if self._stats.get(list_name) != (stat.st_mtime_ns, stat.st_size):
+			print(f'List `{list_name}` changed, reloading it')
+			self._load(list_name)
+
+	def get_state(self) -> dict:
+		''' Returns the names and stats of the lists we've loaded as plain values, so the same lists can be loaded again in a later session.
+
+		Entries aren't kept. Lists are read again from their file, their sidecar index or our directory's pack, which is what makes large lists quick to load.
+		'''
+		return {
+			'lists_dir': str(self.lists_dir),
+			'lists': dict(self._stats),
+		}
+
+	def restore_state(self, state:dict) -> None:
+		''' Loads the lists from get_state() again on the calling thread, i.e. our worker. Only lists from our directory whose file hasn't changed since are loaded.
+
+		Arguments:
+			state(dict): State from get_state().
+		'''
+		if Path(state['lists_dir']).resolve() != Path(self.lists_dir).resolve():
+			return
+
+		for list_name, stats in state['lists'].items():
+			if list_name in self._lists:
+				continue
+
+			try:
+				stat = self._path(list_name).stat()
+			except OSError:
+				continue
+			if [stat.st_mtime_ns, stat.st_size] != list(stats):
+				continue
+
+			try:
+				self._load(list_name)
+			except (OSError, ValueError, StructError) as e:
+				print(e, f'Unable to load list `{list_name}`')
+
+	def set_dir(self, lists_dir:Path) -> None:
+		''' Changes the directory we look for lists in. Our cache is cleared if the directory changed.
+
+		Arguments:
+			lists_dir(Path): The directory in which to search for our lists.
+		'''
+		lists_dir = Path(lists_dir).resolve()
+		if lists_dir != self.lists_dir:
+			self.lists_dir = lists_dir
+			self.clear()
+
+	def clear(self) -> None:
+		''' Forgets every list we've loaded.
+		'''
+		self._lists = {}
+		self._stats = {}
+		self._checked = {}
+		self._missing = {}
+		self._references = {}
+		self._pack = None
+
+
+# Phrase Randomizer used to generate phrases
+########################################
+
+class Phrase_Randomizer:
+	''' A phrase randomizer used to generate random phrases from a master phrase list.
+
+	Phrases can have a code to be replaced by information from any available list.
+
+	Attributes:
+		_lists(List_Cache): Cache of lists of strings to fill variables in phrases, loaded from the lists directory.
+			i.e. if a phrase contains '{p}', a string from the list `p.txt` replaces '{p}' in the phrase.
+
+		_phrases_master([str]|Mapped_List|Packed_List): A public copy of the phrases. This is never manipulated, phrases are dealt from _deck instead. When using a phrase file, these are its entries, see set_phrase_pool.
+		_deck(Phrase_Deck): A shuffled deck of positions in _phrases_master used to give unique phrases. This is None if we're duplicating phrases.
+		last_dealt((Phrase_Deck, int)): The deck and position of the last phrase dealt by get_phrase, so it can be put back with put_back(). None if it wasn't dealt from a deck.
+
+		_templates({str:Phrase_Template}): A cache of compiled phrases, keyed by the raw phrase. Rebuilt whenever the phrase list is set.
+		_entry_templates({str:Phrase_Template}): A cache of compiled list entries that have variables, keyed by the entry. Started over once it holds MAX_ENTRY_TEMPLATES entries.
+		_list_phrases({str:[str]}): Phrases using each list, keyed by list name. Built with our templates, so we know every list our phrases need before they're used. When using a phrase file, phrases are only compiled as they're used, so this is None for every list.
+		_syntax_errors([str]): Errors of phrases that failed to compile. These phrases are shown exactly as they're written.
+		_weighted([str]): Phrases of our phrase list that were read with a `<weight>|` prefix, reported by problems() in case the prefix was meant to be shown.
+		_phrases_digest(str): Hash of our phrase list and its weights, compared between sessions by restore_state. None until it's needed.
+
+		_pools(List_Cache): Cache of the phrase files we can use instead of a phrase list. None until set_phrase_pool is used.
+		_pool_name(str): Name of the phrase file we're using. None if we're using a phrase list.
+
+		_weights((float)): Weight of every phrase in _phrases_master, from their optional `<weight>|` prefix. None if no phrase has a weight.
+		_alias(Alias_Table): Alias table of _weights, used to pick weighted phrases. None if no phrase has a weight.
+
+		_phrase_duplication(bool): Tells the class if we should remove phrases after they have been chosen.
+
+		_min_phrase_count(int=2): The minimum number of phrases that can be in the working phrase list. Once it drops below this level, the phrases will be repopulated.
+	'''
+
+	def __init__(self, list_directory:Path, worker:Background_Worker=None, lists:List_Cache=None) -> None:
+		''' A tool for filling phrases with random information provided by list files.
+
+		Arguments:
+			list_directory: Directory to look for our lists.
+			worker(Background_Worker=None): Worker used to keep our lists up to date in the background.
+			lists(List_Cache=None): List cache to share with other randomizers. If this is None, the randomizer gets its own cache of list_directory.
+		'''
+		self._lists = List_Cache(list_directory, worker) if lists is None else lists
+
+		self._phrases_master  = []
+		self._deck            = None
+		self.last_dealt       = None
+		self._templates       = {}
+		self._entry_templates = {}
+		self._list_phrases    = {}
+		self._syntax_errors   = []
+		self._weighted        = []
+		self._phrases_digest  = None
+		self._weights         = None
+		self._alias           = None
+		self._pools           = None
+		self._pool_name       = None
+
+		self._phrase_duplication = True
+
+		self._min_phrase_count = 2
+
+	def fill_phrase(self, phrase:str) -> None:
+		''' Fills a single phrase with variables from all the lists.
+
+		Arguments:
+			phrase(str): Phrase to fill.
+				{<list>:<num>}: where list is the name of the text file, num is the position in the list.
+				i.e. "Make {p:1} high-five {p:2}" will confirm both of those names are different given there are more than two names in the list `lists/p.txt`.
+				While "Every time {t} does something, {t} takes a shot" will result in completly random choices. They could be different, but there is a chance they could be the same. 1/n where n is the number of items in list `t.txt`
+				Lists do not have to be single characters. i.e. "Get {human} off my swamp" will look in list `lists/human.txt`.
+				Lines of a list can start with a weight, i.e. `5|Common name`, to be picked more or less often than the lines without one, which have a weight of 1.
+				Variables of lists that can't be found or are empty are left as they are, i.e. `{p}`, so a missing list never stops a phrase from being shown.
+				Phrases with a `{` or `}` that isn't part of a variable are shown exactly as they're written.
+				Entries of lists can have variables too, i.e. a line `{adjective} {gun}` in `weapon.txt`, which are filled the same way up to MAX_EXPANSION_DEPTH lists deep. Numbers in an entry's variables only apply within that entry.
+		'''
+		template = self._get_template(phrase)
+
+		# Phrases without any variables don't need any work
+		if not template.slots:
+			return template.phrase
+
+		return self._fill_template(template, 0)
+
+	def _fill_template(self, template:'Phrase_Template', depth:int) -> str:
+		''' Fills a compiled phrase or list entry, filling the variables of the entries picked for it as well.
+
+		Arguments:
+			template(Phrase_Template): Compiled phrase or list entry to fill.
+			depth(int): How many lists deep the template is. Phrases are 0.
+		'''
+		# Getting every list in this phrase once, so a list being swapped out while we fill doesn't mix two versions
+		lists = {list_name: self._load_list(list_name) for list_name in template.list_names}
+		values = self._sample_slots(template, lists)
+
+		# Filling entries of lists that use other lists
+		nested = self._nested_lists(template, depth)
+		if nested:
+			for position, (list_name, _) in enumerate(template.slots):
+				if list_name in nested:
+					values[position] = self._expand(values[position], depth + 1)
+
+		return template.render(values)
+
+	def _nested_lists(self, template:'Phrase_Template', depth:int) -> set:
+		''' Returns the names of the lists used by a template whose entries use other lists, as found when they were loaded. Returns an empty set once we're MAX_EXPANSION_DEPTH lists deep.
+
+		Arguments:
+			template(Phrase_Template): Compiled phrase or list entry.
+			depth(int): How many lists deep the template is.
+		'''
+		if depth >= MAX_EXPANSION_DEPTH:
+			return set()
+		return {list_name for list_name in template.list_names if self._lists.references(list_name)}
+
+	def _expand(self, entry:str, depth:int) -> str:
+		''' Returns a list entry with its variables filled. Entries without variables are returned as they are.
+
+		Arguments:
+			entry(str): Entry picked from a list.
+			depth(int): How many lists deep the entry is.
+		'''
+		if '{' not in entry:
+			return entry
+
+		template = self._entry_templates.get(entry)
+		if template is None:
+			if len(self._entry_templates) >= MAX_ENTRY_TEMPLATES:
+				self._entry_templates = {}
+
+			# Entries that fail to compile are shown as they are, like phrases
+			try:
+				template = Phrase_Template(entry)
+			except ValueError:
+				template = Phrase_Template.literal(entry)
+			self._entry_templates[entry] = template
+
+		if not template.slots:
+			return template.phrase
+		return self._fill_template(template, depth)
+
+	def _sample_slots(self, template:'Phrase_Template', lists:dict) -> list:
+		''' Picks a value for every slot in a template. Only the lists used by the template are touched.
+
+		Numbered slots of the same list are sampled without replacement, so different numbers always resolve to different values as long as the list is long enough.
+		Numbers wrap around the length of the list, so numbers that wrap onto each other resolve to the same value.
+
+		Arguments:
+			template(Phrase_Template): Compiled phrase to pick values for.
+			lists({str:[str]}): Every list used by the template, keyed by name.
+
+		Returns:
+			A list of values, one for each slot in template.slots.
+		'''
+		# Picking distinct positions for each list's numbered slots
+		picks = {}
+		for list_name, numbers in template.numbered.items():
+			list_len = len(lists[list_name])
+			wrapped = list(dict.fromkeys(number % list_len for number in numbers))
+			picks[list_name] = dict(zip(wrapped, sample_positions(lists[list_name], len(wrapped))))
+
+		# Filling our slots, un-numbered slots are completely random
+		values = []
+		for list_name, index in template.slots:
+			entries = lists[list_name]
+			if index is None:
+				values.append(entries[random_position(entries)])
+			else:
+				values.append(entries[picks[list_name][index % len(entries)]])
+		return values
+
+	def _sample_slot_columns(self, template:'Phrase_Template', lists:dict, count:int) -> list:
+		''' Picks values for every slot in a template for count phrases at once. The batch version of _sample_slots, following the same rules.
+
+		Arguments:
+			template(Phrase_Template): Compiled phrase to pick values for.
+			lists({str:[str]}): Every list used by the template, keyed by name.
+			count(int): Number of phrases to pick values for.
+
+		Returns:
+			A column of count values for each slot in template.slots.
+		'''
+		# Picking a column of positions for each number used in each list
+		picks = {}
+		for list_name, numbers in template.numbered.items():
+			list_len = len(lists[list_name])
+			wrapped = list(dict.fromkeys(number % list_len for number in numbers))
+
+			# A single number doesn't need sampling without replacement
+			if len(wrapped) == 1:
+				picks[list_name] = {wrapped[0]: random_positions(lists[list_name], count)}
+			else:
+				rows = [sample_positions(lists[list_name], len(wrapped)) for _ in range(count)]
+				picks[list_name] = dict(zip(wrapped, zip(*rows)))
+
+		# Filling our columns, un-numbered slots are completely random
+		columns = []
+		for list_name, index in template.slots:
+			entries = lists[list_name]
+			if index is None:
+				positions = random_positions(entries, count)
+			else:
+				positions = picks[list_name][index % len(entries)]
+			columns.append([entries[position] for position in positions])
+		return columns
+
+	def _get_template(self, phrase:str) -> 'Phrase_Template':
+		''' Returns the compiled template for a phrase, compiling and caching it if we haven't seen it before.
+
+		Phrases that fail to compile are cached as literal templates, so they're shown exactly as they're written. Their errors are kept for problems().
+
+		Arguments:
+			phrase(str): Raw phrase to look up.
+		'''
+		template = self._templates.get(phrase)
+		if template is None:
+			# Phrase files are only compiled as they're used, so their cache is started over rather than growing with the file
+			if self._pool_name is not None and len(self._templates) >= MAX_ENTRY_TEMPLATES:
+				self._templates = {}
+
+			try:
+				template = Phrase_Template(phrase)
+			except ValueError as e:
+				print(e)
+				if str(e) not in self._syntax_errors:
+					self._syntax_errors.append(str(e))
+				template = Phrase_Template.literal(phrase)
+			self._templates[phrase] = template
+		return template
+
+	def _compile_templates(self) -> None:
+		''' Rebuilds our template cache from the master phrase list, along with the phrases using each list.
+		'''
+		self._templates = {}
+		self._syntax_errors = []
+		list_phrases = {}
+		for phrase in self._phrases_master:
+			for list_name in self._get_template(phrase).list_names:
+				list_phrases.setdefault(list_name, []).append(phrase)
+
+		self._list_phrases = list_phrases
+
+	def preload_lists(self) -> None:
+		''' Loads every list our phrases use on our list cache's worker, so no spin has to wait for a list to load.
+		'''
+		self._lists.preload(list(self._list_phrases))
+
+	def problems(self) -> list:
+		''' Returns a description of every problem found in our phrases: phrases that failed to compile, lists they use that can't be found or are empty, directly or through other lists, and lists that use each other.
+
+		Only what our list cache already knows is reported, so this never touches the file system and can be used from the properties window. Lists that are still being preloaded show up once they've been looked for.
+		'''
+		problems = list(self._syntax_errors)
+		if self._pool_name is None and self._weighted:
+			problems.append(f"{len(self._weighted)} phrases are read with a `<weight>|` prefix, i.e. `{self._weighted[0]}`. Start a phrase with `\\` to show its prefix as it's written.")
+		if self._pool_name is not None and self._pools.missing(self._pool_name):
+			problems.append(f'Phrase file `{self._pool_name}.txt` not found in `{self._pools.lists_dir}`.')
+
+		list_phrases = dict(self._list_phrases)
+		graph = self._lists.expansion_graph(list(list_phrases))
+
+		# Lists used by our phrases, then lists used by other lists
+		for list_name in graph:
+			if self._lists.missing(list_name):
+				problem = f'List `{list_name}.txt` not found in `{self._lists.lists_dir}`'
+			elif self._lists.empty(list_name):
+				problem = f'List `{list_name}.txt` in `{self._lists.lists_dir}` is empty'
+			else:
+				continue
+
+			if list_name in list_phrases and list_phrases[list_name] is None:
+				problems.append(f'{problem}, used by phrase file `{self._pool_name}.txt`.')
+			elif list_name in list_phrases:
+				problems.append(f'{problem}, used by {len(list_phrases[list_name])} phrases.')
+			else:
+				used_by = ', '.join(f'`{name}`' for name, names in graph.items() if list_name in names)
+				problems.append(f'{problem}, used by lists {used_by}.')
+
+		for cycle in find_cycles(graph):
+			problems.append(f"Lists {' -> '.join(f'`{name}`' for name in cycle)} use each other, they're only filled {MAX_EXPANSION_DEPTH} lists deep.")
+		return problems
+
+	def _check_len(self) -> None:
+		''' Checks if the length of our phrase list is long enough to continue.
+
+		Will raise an error if our phrase list length is long enough.
+		'''
+		if len(self._phrases_master) <= self._min_phrase_count:
+			raise ValueError(f'Phrase list must include more than {self._min_phrase_count} phrases.')
+
+	def _load_list(self, list_name:str) -> list:
+		''' Returns a list from the list cache, loading it from its file if we haven't seen it before.
+
+		Will look in the list cache's directory for the list_name. If the list can't be found or is empty, a list holding only the list's variable is returned, so its variables are left as they are.
+
+		Arguments:
+			list_name(str): Name of the list to look for. i.e. `people` will look for `people.txt`.
+		'''
+		try:
+			entries = self._lists.get(list_name)
+		except FileNotFoundError:
+			entries = []
+		return entries if len(entries) else [f'{{{list_name}}}']
+
+	def get_dummy_phrases(self, count:int=1, filled:bool=True) -> list:
+		''' Return a list of random filled phrases.
+
+		This will not remove phrases even if the setting is on. You must use get_filled_phrase for that.
+
+		Arguments:
+			count(int=1): Number of phrases to generate
+			filled(bool=True): If true, returns phrases that are filled. Otherwise, it returns the raw phrases.
+
+		Returns:
+			List of generated phrases
+		'''
+		return self.get_phrase_batch(count, filled)
+
+	def get_phrase_batch(self, count:int, filled:bool=True) -> list:
+		''' Return a list of random phrases generated in one pass. Like get_dummy_phrases, this never deals phrases from the deck.
+
+		Every phrase index and every slot index is drawn in bulk, and phrases using the same template are filled together. Large batches (i.e. for dry runs and stats) cost far less than filling phrases one at a time.
+
+		Arguments:
+			count(int): Number of phrases to generate
+			filled(bool=True): If true, returns phrases that are filled. Otherwise, it returns the raw phrases.
+
+		Returns:
+			List of generated phrases, in random order.
+		'''
+		# Picking up changes to our phrase file, then checking min phrase count
+		self._refresh_pool()
+		self._check_len()
+
+		# Drawing all of our phrases at once
+		if self._deck is None:
+			positions = random_indices(len(self._phrases_master), count) if self._alias is None else self._alias.draw_batch(count)
+		else:
+			positions = self._deck.peek_random_batch(count)
+
+		if not filled:
+			return [self._phrases_master[position] for position in positions]
+
+		# Grouping the rows of our batch by phrase, so each template is filled in one go
+		rows_by_position = {}
+		for row, position in enumerate(positions):
+			rows_by_position.setdefault(position, []).append(row)
+
+		phrases = [None] * count
+		for position, rows in rows_by_position.items():
+			template = self._get_template(self._phrases_master[position])
+
+			# Phrases without any variables don't need any work
+			if not template.slots:
+				filled_phrases = [template.phrase] * len(rows)
+			else:
+				lists = {list_name: self._load_list(list_name) for list_name in template.list_names}
+				columns = self._sample_slot_columns(template, lists, len(rows))
+
+				# Filling entries of lists that use other lists
+				nested = self._nested_lists(template, 0)
+				if nested:
+					for slot, (list_name, _) in enumerate(template.slots):
+						if list_name in nested:
+							columns[slot] = [self._expand(value, 1) for value in columns[slot]]
+
+				filled_phrases = [template.render(values) for values in zip(*columns)]
+
+			for row, filled_phrase in zip(rows, filled_phrases):
+				phrases[row] = filled_phrase
+
+		return phrases
+
+	def get_phrase(self, filled:bool=True) -> str:
+		''' Return a single phrase that has been populated with list information.
+
+		Will deal the phrase from our deck of unique phrases if setting is on.
+
+		Arguments:
+			filled(bool=True): If true, returns phrases that are filled. Otherwise, it returns the raw phrases.
+		'''
+		# Picking up changes to our phrase file, then checking min phrase count
+		self._refresh_pool()
+		self._check_len()
+
+		# Dealing our phrase from the deck if we're giving unique phrases
+		if self._deck is None:
+			self.last_dealt = None
+			phrase = self._random_phrase()
+		else:
+			self.last_dealt = (self._deck, self._deck.draw())
+			phrase = self._phrases_master[self.last_dealt[1]]
+
+		return self.fill_phrase(phrase) if filled else phrase
+
+	def put_back(self, dealt:tuple) -> None:
+		''' Puts a phrase dealt by get_phrase back in our deck, so it's dealt again rather than being skipped. Ignored if our deck was rebuilt since.
+
+		Arguments:
+			dealt((Phrase_Deck, int)): last_dealt right after the phrase was dealt.
+		'''
+		if dealt is not None and dealt[0] is self._deck:
+			self._deck.put_back(dealt[1])
+
+	def _random_phrase(self) -> str:
+		''' Returns a random raw phrase from the working phrases without removing it.
+
+		When giving unique phrases, this only picks from phrases remaining in the deck.
+		'''
+		if self._deck is None and self._alias is None:
+			return random_choice(self._phrases_master)
+		if self._deck is None:
+			return self._phrases_master[self._alias.draw()]
+		return self._phrases_master[self._deck.peek_random()]
+
+	def set_phrase_list(self, phrase_list:list) -> None:
+		''' Updates the randomizers' copy of the phrase list.
+
+		If the length of this is the same or less than our _min_phrase_count, then this will throw a value error.
+
+		Phrases can start with a weight, i.e. `0.2|A rare phrase`, to be picked more or less often than phrases without one, which have a weight of 1. The weights' alias table is only rebuilt if they changed.
+		Phrases starting with a `\\` keep a prefix that looks like a weight, i.e. `\\3|2 odds` shows `3|2 odds`.
+
+		Every list used by our phrases is then loaded in the background. See problems() for phrases that failed to compile and lists that can't be found.
+
+		Arguments:
+			phrase_list(list:str): A list of phrases from the user.
+		'''
+		# A phrase file's alias table isn't ours to keep, see _refresh_pool
+		from_pool = self._pool_name is not None
+		self._pool_name = None
+		self._phrases_digest = None
+		self._phrases_master, weights = split_weights(phrase_list)
+		self._weighted = [phrase for phrase in phrase_list if '|' in phrase and WEIGHT_PATTERN.match(phrase)]
+		if from_pool or weights != self._weights:
+			self._weights, self._alias = weights, None
+			if weights is not None:
+				try:
+					self._alias = Alias_Table(weights)
+				except ValueError as e:
+					print(e, 'Ignoring phrase weights')
+
+		# Compiling our phrases once so filling them doesn't need to parse them again, then loading every list they use
+		self._compile_templates()
+		self.preload_lists()
+
+		# Now we need to update our working phrase lists
+		self.update_phrases()
+
+	def set_phrase_pool(self, pools:List_Cache, pool_name:str) -> None:
+		''' Uses the phrases of a file in a phrases directory instead of a phrase list, i.e. for pools of phrases too large to keep in the script settings.
+
+		Phrase files are loaded like lists, so large files are memory mapped and indexed by line offset, and lines can have weights the same way phrases can. Phrases are only compiled as they're used.
+		Our phrase file is checked for changes whenever we're asked for phrases, and only our deck is rebuilt once it's reloaded. If it can't be found, we have no phrases until it shows up.
+
+		Arguments:
+			pools(List_Cache): Cache of the phrase files, shared by every randomizer.
+			pool_name(str): Name of the phrase file. i.e. `dares` uses `dares.txt`.
+		'''
+		if (pools, pool_name) == (self._pools, self._pool_name):
+			self._refresh_pool()
+			return
+
+		self._pools, self._pool_name = pools, pool_name
+		self._phrases_master = None
+		self._refresh_pool()
+
+	def _refresh_pool(self) -> None:
+		''' Switches to the latest entries of our phrase file, if we're using one and it was reloaded since we last looked.
+		'''
+		if self._pool_name is None:
+			return
+
+		# A file that's still missing is left as it is
+		try:
+			entries = self._pools.get(self._pool_name)
+		except FileNotFoundError:
+			if self._phrases_master is not None and not self._phrases_master:
+				return
+			entries = []
+		if entries is self._phrases_master:
+			return
+
+		self._phrases_master = entries
+		self._weights = None
+		self._alias = getattr(entries, 'alias', None)
+		self._templates = {}
+		self._syntax_errors = []
+		self._list_phrases = {list_name: None for list_name in self._pools.references(self._pool_name)}
+
+		self.preload_lists()
+		self.update_phrases()
+
+	def set_lists_dir(self, lists_dir:Path) -> None:
+		''' Updates the path in whci to search for lists.
+
+		Arguments:
+			lists_dir(Path): The directory in which to search for our lists. They should be immediate children of this directory.
+		'''
+		print(f'setting our new lists directory to `{lists_dir}`')
+		self._lists.set_dir(lists_dir)
+
+	def clear_list_cache(self) -> None:
+		''' Forces a clear of the list cache. Lists are reloaded automatically when their file changes, but this is useful if there are performance issues from so many lists loaded into memory.
+		'''
+		self._lists.clear()
+
+	def pack_lists(self) -> None:
+		''' Packs every list in our lists directory into a single file that loads without reading or decoding any entries. See Packed_Lists.
+		'''
+		self._lists.pack()
+
+	def set_phrase_duplication(self, phrase_duplication:bool=True) -> None:
+		''' Configures the randomizer to give duplicated phrases. If this is set to false, an internal list of phrases are used to remove phrases from.
+		'''
+		print(f'Updating phrase duplication to {phrase_duplication}')
+		self._phrase_duplication = phrase_duplication
+
+		# Now we need to update our phrase lists
+		self.update_phrases()
+
+	def get_state(self) -> dict:
+		''' Returns everything needed to pick up where we left off in a later session: where we are in our deck. Our lists can be shared, so their state is taken from our List_Cache separately.
+
+		Only plain values are returned, so the state can be saved as JSON.
+		'''
+		return {
+			'phrases': self._phrases_key(),
+			'phrase_duplication': self._phrase_duplication,
+			'deck': None if self._deck is None else self._deck.get_state(),
+		}
+
+	def _phrases_key(self) -> str:
+		''' Returns a key for what our deck was shuffled from, to compare between sessions. Phrase lists are compared by a hash of their phrases and weights, phrase files by name and version.
+		'''
+		if self._pool_name is not None:
+			return dumps(['pool', self._pool_name, self._pools.version(self._pool_name)])
+
+		if self._phrases_digest is None:
+			self._phrases_digest = sha1(dumps([self._phrases_master, self._weights]).encode()).hexdigest()
+		return self._phrases_digest
+
+	def restore_state(self, state:dict) -> None:
+		''' Restores whatever is still valid from get_state().
+
+		The deck is only restored if our phrases, their weights and phrase duplication haven't changed.
+
+		Arguments:
+			state(dict): State from get_state().
+		'''
+		if self._deck is not None and state['deck'] is not None and state['phrases'] == self._phrases_key():
+			self._deck.restore_state(state['deck'])
+
+	def update_phrases(self) -> None:
+		''' Updates the working copy of phrases with our master list.
+
+		Typically used when we're changing our phrase duplication setting, or updating our phrases master list.
+		'''
+		# If we're duplicating, we don't need a deck and pick from our master list directly
+		if self._phrase_duplication:
+			self._deck = None
+
+		# Otherwise, we're going to deal from a freshly shuffled deck
+		else:
+			self._deck = Phrase_Deck(len(self._phrases_master), self._min_phrase_count, self._alias)
+
+
+# Spin buffer used to have spins ready before they're requested
+########################################
+
+class Spin_Buffer:
+	''' Keeps a few fully generated spins ready, generated by our background worker, so a spin never waits on the randomizer or on lists loading from disk.
+
+	A spin is a list of stages, each being a (final_phrase, animation_phrases) pair to pass to Wheel.spin_wheel. Shuffling variables separately gives two stages, otherwise there is only one.
+
+	The randomizer isn't thread safe, so anything using it while the buffer is running must hold our lock. Anything changing what a spin would look like must call invalidate().
+	When giving unique phrases, every ready spin has already dealt its final phrase from the deck, so spins that are thrown away put their phrase back rather than skipping it.
+
+	Attributes:
+		lock(RLock): Lock guarding our randomizer.
+		size(int): Number of spins to keep ready.
+		animation_phrase_count(int): Number of animation phrases in each stage.
+		separate_list_shuffle(bool): If spins shuffle their list variables in a separate stage.
+		_randomizer(Phrase_Randomizer): Randomizer used to generate spins.
+		_worker(Background_Worker): Worker generating our spins.
+		_spins(deque): Spins that are ready to play, as (spin, dealt) pairs where dealt is the randomizer's last_dealt for the spin's final phrase.
+		_generation(int): Bumped every time we're invalidated, so spins generated for old settings are thrown away.
+		_filling(bool): If a job filling our buffer is running or waiting to run.
+	'''
+
+	def __init__(self, randomizer:Phrase_Randomizer, worker:Background_Worker, size:int=2) -> None:
+		self.lock = RLock()
+		self.size = size
+		self.animation_phrase_count = 12
+		self.separate_list_shuffle = False
+
+		self._randomizer = randomizer
+		self._worker = worker
+		self._spins = deque()
+		self._generation = 0
+		self._filling = False
+
+	def configure(self, animation_phrase_count:int, separate_list_shuffle:bool) -> None:
+		''' Updates how our spins are generated.
+
+		Ready spins are thrown away if separate_list_shuffle changed. If only the number of animation phrases changed, they're kept and trimmed or extended as they're played, see _fit.
+
+		Arguments:
+			animation_phrase_count(int): Number of animation phrases in each stage.
+			separate_list_shuffle(bool): If spins shuffle their list variables in a separate stage.
+		'''
+		self.animation_phrase_count = animation_phrase_count
+		if separate_list_shuffle != self.separate_list_shuffle:
+			self.separate_list_shuffle = separate_list_shuffle
+			self.invalidate()
+
+	def generate(self) -> list:
+		''' Generates a spin with our randomizer. Used by our worker, or by pop() when nothing is ready.
+		'''
+		randomizer = self._randomizer
+		count = self.animation_phrase_count
+
+		with self.lock, Data.Metrics.timed('phrase_generation'):
+			if self.separate_list_shuffle:
+				# We play our shuffle animation twice, once with raw phrases and once with filled versions of our final phrase
+				final_phrase = randomizer.get_phrase(filled=False)
+				return [
+					(final_phrase, randomizer.get_dummy_phrases(count, filled=False)),
+					(randomizer.fill_phrase(final_phrase), [randomizer.fill_phrase(final_phrase) for _ in range(count)]),
+				]
+
+			return [(randomizer.get_phrase(filled=True), randomizer.get_dummy_phrases(count, filled=True))]
+
+	def _fit(self, spin:list) -> list:
+		''' Returns a ready spin with as many animation phrases as we use now, trimming or extending its stages if that changed since it was generated. Its final phrase is kept.
+
+		Arguments:
+			spin(list): Spin from generate().
+		'''
+		count = self.animation_phrase_count
+		extra = count - len(spin[0][1])
+		if extra == 0:
+			return spin
+		if extra < 0:
+			return [(final_phrase, animation_phrases[:count]) for final_phrase, animation_phrases in spin]
+
+		randomizer = self._randomizer
+		with self.lock, Data.Metrics.timed('phrase_generation'):
+			if self.separate_list_shuffle:
+				(raw_phrase, raw_phrases), (final_phrase, filled_phrases) = spin
+				return [
+					(raw_phrase, raw_phrases + randomizer.get_dummy_phrases(extra, filled=False)),
+					(final_phrase, filled_phrases + [randomizer.fill_phrase(raw_phrase) for _ in range(extra)]),
+				]
+
+			final_phrase, animation_phrases = spin[0]
+			return [(final_phrase, animation_phrases + randomizer.get_dummy_phrases(extra, filled=True))]
+
+	def pop(self) -> list:
+		''' Returns the next spin to play, generating one right away if none are ready, then starts refilling.
+		'''
+		try:
+			spin, _ = self._spins.popleft()
+		except IndexError:
+			spin = self.generate()
+		else:
+			spin = self._fit(spin)
+
+		self.fill()
+		return spin
+
+	def fill(self) -> None:
+		''' Starts filling our buffer in the background if it isn't full.
+		'''
+		if self._filling or len(self._spins) >= self.size:
+			return
+
+		self._filling = True
+		self._worker.submit(self._fill, self._generation)
+
+	def _fill(self, generation:int) -> None:
+		''' Worker job generating spins until our buffer is full or we're invalidated.
+
+		Arguments:
+			generation(int): Our generation when the job was submitted.
+		'''
+		try:
+			while len(self._spins) < self.size and generation == self._generation:
+				with self.lock:
+					spin = self.generate()
+					if generation == self._generation:
+						self._spins.append((spin, self._randomizer.last_dealt))
+
+		# The same error will come up again when a spin is requested, so we don't keep trying
+		except Exception as e:
+			print(e, 'Unable to prepare spins')
+
+		finally:
+			self._filling = False
+
+		# We may have been invalidated while we were running
+		if generation != self._generation:
+			self.fill()
+
+	def invalidate(self) -> None:
+		''' Throws away any ready spins and starts generating new ones.
+		'''
+		self.clear()
+		self.fill()
+
+	def clear(self) -> None:
+		''' Throws away any ready spins without generating new ones. Their final phrases are put back in the deck, newest first, so they're dealt in the same order as before.
+		'''
+		with self.lock:
+			self._generation += 1
+			while self._spins:
+				self._randomizer.put_back(self._spins.pop()[1])
+
+
+# Spin queue used to decide what happens to triggers while a wheel spins
+########################################
+
+class Spin_Queue:
+	''' Decides what happens to triggers that come in while a wheel is spinning, so bursts of triggers never pile up more spins than the policy allows.
+
+	Policies:
+		coalesce: One spin is kept to play once the current one finishes. Any more triggers are merged into it.
+		fifo: Spins are kept to play one after the other, up to max_depth of them. Any more triggers are dropped.
+		drop: Triggers are dropped.
+		preempt: The current spin is stopped and a new one plays right away.
+
+	Attributes:
+		policy(str): One of POLICIES.
+		max_depth(int): Maximum number of waiting spins with the fifo policy.
+		pending(int): Number of spins waiting for the current one to finish.
+	'''
+
+	POLICIES = ['coalesce', 'fifo', 'drop', 'preempt']
+
+	def __init__(self, policy:str='coalesce', max_depth:int=3) -> None:
+		self.policy = policy
+		self.max_depth = max_depth
+		self.pending = 0
+
+	def configure(self, policy:str, max_depth:int) -> None:
+		''' Changes our policy. Spins that are already waiting are kept, up to what the new policy allows.
+
+		Arguments:
+			policy(str): One of POLICIES. Unknown policies are treated as coalesce.
+			max_depth(int): Maximum number of waiting spins with the fifo policy.
+		'''
+		self.policy = policy if policy in self.POLICIES else 'coalesce'
+		self.max_depth = max(1, max_depth)
+		self.pending = min(self.pending, self.depth())
+
+	def depth(self) -> int:
+		''' Returns the maximum number of waiting spins our policy allows.
+		'''
+		return {'coalesce': 1, 'fifo': self.max_depth}.get(self.policy, 0)
+
+	def offer(self) -> str:
+		''' Handles a trigger that came in while spinning.
+
+		Returns:
+			str: What happened to the trigger. `queued` if a spin is now waiting for it, `coalesced` if it was merged into a waiting spin, `dropped` if it was ignored, or `preempted` if the current spin should stop for a new one.
+		'''
+		if self.policy == 'preempt':
+			return 'preempted'
+		if self.pending < self.depth():
+			self.pending += 1
+			return 'queued'
+		return 'coalesced' if self.policy == 'coalesce' else 'dropped'
+
+	def take(self) -> bool:
+		''' Returns if a spin is waiting, taking it off the queue. Called once the current spin finishes.
+		'''
+		if self.pending:
+			self.pending -= 1
+			return True
+		return False
+
+	def clear(self) -> None:
+		''' Forgets every waiting spin.
+		'''
+		self.pending = 0
+
+
+# Frame scheduler used to drive animations without blocking OBS
+########################################
+
+class Frame_Scheduler:
+	''' Runs callbacks at scheduled times from a single OBS timer.
+
+	OBS runs script timers on its own thread, so we can never sleep in a callback. Instead, everything that needs to happen later is scheduled here and run by scheduler_tick.
+	Times are absolute monotonic times, so a late tick never pushes back the events after it.
+
+	Events are scheduled from the timer thread, hotkeys and the properties window, so our heap and timer are guarded by a lock. Callbacks run without holding it, so they can schedule more events.
+
+	Attributes:
+		tick_interval(int): Delay in ms between ticks. OBS won't tick timers faster than once per video frame.
+		_events([(float, int, callable)]): A heap of (due time, sequence, callback). The sequence keeps events due at the same time in the order they were scheduled.
+		_sequence(int): Counter used to order events that are due at the same time.
+		_running(bool): If our OBS timer is currently added.
+		_lock(Lock): Guards _events, _sequence and _running.
+	'''
+
+	def __init__(self, tick_interval:int=5) -> None:
+		self.tick_interval = tick_interval
+		self._events = []
+		self._sequence = 0
+		self._running = False
+		self._lock = Lock()
+
+	def call_at(self, due:float, callback) -> None:
+		''' Schedules a callback to run at the given time.
+
+		Arguments:
+			due(float): Monotonic time in seconds when the callback should run.
+			callback(callable): Function taking no arguments.
+		'''
+		with self._lock:
+			self._sequence += 1
+			heappush(self._events, (due, self._sequence, callback))
+
+			# Starting our timer if this is the only thing we have to do
+			if not self._running:
+				self._running = True
+				obs.timer_add(scheduler_tick, self.tick_interval)
+
+	def call_later(self, delay:float, callback) -> None:
+		''' Schedules a callback to run after the given delay.
+
+		Arguments:
+			delay(float): Delay in ms.
+			callback(callable): Function taking no arguments.
+		'''
+		self.call_at(monotonic() + delay / 1000, callback)
+
+	def tick(self) -> None:
+		''' Runs every callback that is due. Stops our timer once there is nothing left to run.
+		'''
+		now = monotonic()
+		while True:
+			with self._lock:
+				if not self._events or self._events[0][0] > now:
+					# Stopping while we hold our lock, so an event scheduled from another thread is never left without a timer
+					if not self._events:
+						self._stop()
+					return
+				_, _, callback = heappop(self._events)
+
+			# A failing callback shouldn't stop the ones after it
+			try:
+				callback()
+			except Exception as e:
+				print(e, 'Scheduled callback failed')
+
+	def stop(self) -> None:
+		''' Removes our OBS timer. Any events that are still scheduled are kept until the next call.
+		'''
+		with self._lock:
+			self._stop()
+
+	def _stop(self) -> None:
+		''' Removes our OBS timer. Our lock must be held.
+		'''
+		if self._running:
+			self._running = False
+			obs.timer_remove(scheduler_tick)
+
+	def clear(self) -> None:
+		''' Drops every scheduled event and stops our timer.
+		'''
+		with self._lock:
+			self._events = []
+			self._stop()
+
+
+def scheduler_tick():
+	''' OBS timer callback for Data.Scheduler. Timers are identified by their function, so this needs to be a plain function.
+	'''
+	Data.Scheduler.tick()
+
+
+def animation_frame_times(length:float, deceleration_scale:float) -> tuple:
+	''' Calculates when each frame of the text animation is displayed.
+
+	I've played around with this function for many an hour to perfect. I've landed on a cubic function modeled by this wolframapha link.
+	https://www.wolframalpha.com/input?i=52+*+%28x+%2F+8000+*+2%29+%5E+%281%2F4%29
+	Where deceleration_scale is 52 and length is 8000 (8 seconds)
+	This functions always starts with very fast delays and slows down as the index increases.
+
+	Arguments:
+		length(float): The length of the animation in ms.
+		deceleration_scale(float): The scale at which to decelerate.
+
+	Returns:
+		A tuple of (frame_times, end_time). frame_times is a list of offsets in ms from the start of the animation for every frame, end_time is the offset of the final phrase.
+	'''
+	frame_times = []
+	elapsed = 0
+	remaining = length
+
+	# Capping our animation after 400 frames to prevent an infinite loop
+	for deceleration_index in range(1, 400):
+		anim_delay = (deceleration_index ** 4) / (length * deceleration_scale)
+		elapsed += anim_delay
+		remaining -= anim_delay
+
+		# Displaying a random phrase unless our time is too short
+		if remaining < 0:
+			break
+		frame_times.append(elapsed)
+
+	return frame_times, elapsed
+
+
+# Source cache used to find our sources without searching OBS
+########################################
+
+class Source_Cache:
+	''' Keeps weak references to sources we've looked up by name, so finding them again doesn't search every source in OBS.
+
+	Weak references don't keep a source alive, so a deleted source is never handed back as a dangling pointer. OBS's rename and remove signals invalidate entries through on_source_renamed and on_source_removed.
+
+	Attributes:
+		_weak_sources({str:obs_weak_source_t}): Weak references to sources, keyed by source name.
+	'''
+
+	def __init__(self) -> None:
+		self._weak_sources = {}
+
+	def get(self, source_name:str):
+		''' Returns a strong reference to the source with the given name, or None if it doesn't exist. The reference must be released with obs_source_release.
+
+		Arguments:
+			source_name(str): Name of the source to look for.
+		'''
+		weak_source = self._weak_sources.get(source_name)
+		if weak_source is not None:
+			source = obs.obs_weak_source_get_source(weak_source)
+
+			# Our source is still around, unless it has been removed but not destroyed yet
+			if source is not None and not obs.obs_source_removed(source):
+				return source
+			obs.obs_source_release(source)
+			self.invalidate(source_name)
+
+		# We don't know this source yet, so we look it up once and remember it
+		source = obs.obs_get_source_by_name(source_name)
+		if source is not None:
+			self._weak_sources[source_name] = obs.obs_source_get_weak_source(source)
+		return source
+
+	def invalidate(self, source_name:str) -> None:
+		''' Forgets the source with the given name, it will be looked up again the next time it's needed.
+
+		Arguments:
+			source_name(str): Name of the source to forget.
+		'''
+		weak_source = self._weak_sources.pop(source_name, None)
+		if weak_source is not None:
+			obs.obs_weak_source_release(weak_source)
+
+	def clear(self) -> None:
+		''' Forgets every source we have cached.
+		'''
+		for source_name in list(self._weak_sources):
+			self.invalidate(source_name)
+
+
+class Text_Source_Index:
+	''' Names of every text source in OBS, for our source dropdowns.
+
+	Every source is only looked at once, the first time the names are needed. After that OBS's create, rename, remove and destroy signals keep the index up to date through on_source_created, on_source_renamed and on_source_removed, so opening our properties never goes through every source again.
+
+	Attributes:
+		_names(set): Names of every text source. None until the index is built.
+	'''
+
+	TEXT_SOURCE_IDS = {'text_gdiplus', 'text_ft2_source'}
+
+	def __init__(self) -> None:
+		self._names = None
+
+	def names(self) -> list:
+		''' Returns the sorted names of every text source, building the index if we haven't yet.
+		'''
+		if self._names is None:
+			self._build()
+		return sorted(self._names)
+
+	def _build(self) -> None:
+		''' Looks through every source in OBS once for text sources.
+		'''
+		names = set()
+		sources = obs.obs_enum_sources()
+		if sources is not None:
+			for source in sources:
+				if obs.obs_source_get_unversioned_id(source) in self.TEXT_SOURCE_IDS:
+					names.add(obs.obs_source_get_name(source))
+		obs.source_list_release(sources)
+		self._names = names
+
+	def add(self, source) -> None:
+		''' Adds a source to the index if it's a text source.
+
+		Arguments:
+			source(obs_source_t): The source, i.e. from the calldata of `source_create`.
+		'''
+		if self._names is not None and obs.obs_source_get_unversioned_id(source) in self.TEXT_SOURCE_IDS:
+			self._names.add(obs.obs_source_get_name(source))
+
+	def rename(self, previous_name:str, new_name:str) -> None:
+		''' Renames a source in the index, if it's in there.
+
+		Arguments:
+			previous_name(str): Name the source had.
+			new_name(str): Name the source has now.
+		'''
+		if self._names is not None and previous_name in self._names:
+			self._names.discard(previous_name)
+			self._names.add(new_name)
+
+	def discard(self, source_name:str) -> None:
+		''' Removes a source from the index, if it's in there.
+
+		Arguments:
+			source_name(str): Name of the source.
+		'''
+		if self._names is not None:
+			self._names.discard(source_name)
+
+	def clear(self) -> None:
+		''' Forgets our index. It's built again the next time it's needed.
+		'''
+		self._names = None
+
+
+# Sound pool used to play sounds without loading them every time
+########################################
+
+class Sound_Pool:
+	''' Keeps a private media source loaded for each sound we play, so playing a sound only restarts a source that already has its file open.
+
+	Attributes:
+		output_index(int): The output channel our sounds play on.
+		_sounds({str:obs_source_t}): Media sources keyed by the path of their sound file.
+	'''
+
+	def __init__(self, output_index:int) -> None:
+		self.output_index = output_index
+		self._sounds = {}
+
+	def set_paths(self, sound_paths:list) -> None:
+		''' Makes sure we have a media source for every path. Sources for paths we already have are kept, and sources for paths no longer given are released.
+
+		Arguments:
+			sound_paths([str]): Paths of every sound we want ready to play. Empty paths are ignored.
+		'''
+		sound_paths = [str(sound_path) for sound_path in sound_paths if sound_path]
+
+		# Releasing sounds we don't need anymore
+		for sound_path in list(self._sounds):
+			if sound_path not in sound_paths:
+				obs.obs_source_release(self._sounds.pop(sound_path))
+
+		# Loading any new sounds
+		for sound_path in sound_paths:
+			if sound_path not in self._sounds:
+				self._sounds[sound_path] = self._create_source(sound_path)
+
+	def _create_source(self, sound_path:str):
+		''' Creates a private media source for a sound file. It's kept open while inactive so restarting it doesn't open the file again.
+
+		Arguments:
+			sound_path(str): Path of the sound file.
+		'''
+		print(f'Loading sound `{sound_path}`')
+		sound_data = obs.obs_data_create()
+		obs.obs_data_set_string(sound_data, 'local_file', sound_path)
+		obs.obs_data_set_bool(  sound_data, 'is_local_file', True)
+		obs.obs_data_set_bool(  sound_data, 'close_when_inactive', False)
+
+		# Creating our source, and setting a monitoring type for playing
+		try:
+			sound_source = obs.obs_source_create_private('ffmpeg_source', 'Global Media Source', sound_data)
+		finally:
+			obs.obs_data_release(sound_data)
+		obs.obs_source_set_monitoring_type(sound_source, obs.OBS_MONITORING_TYPE_MONITOR_AND_OUTPUT)
+
+		return sound_source
+
+	def play(self, sound_path:str) -> None:
+		''' Plays a sound from the start, loading it first if it isn't in the pool yet.
+
+		Arguments:
+			sound_path(str): Path of the sound file.
+		'''
+		sound_path = str(sound_path)
+		if sound_path not in self._sounds:
+			self._sounds[sound_path] = self._create_source(sound_path)
+
+		sound_source = self._sounds[sound_path]
+		obs.obs_set_output_source(self.output_index, sound_source)
+		obs.obs_source_media_restart(sound_source)
+
+	def clear(self) -> None:
+		''' Stops our output channel and releases every sound.
+		'''
+		obs.obs_set_output_source(self.output_index, None)
+		for sound_source in self._sounds.values():
+			obs.obs_source_release(sound_source)
+		self._sounds = {}
+
+
+# Settings writer used to save settings without blocking OBS
+########################################
+
+class Settings_Writer:
+	''' Saves settings to a file, only once they stop changing and only if they changed since we last wrote them.
+
+	OBS updates our settings on every keystroke and slider tick, so saves are debounced with an OBS timer. The file is written on our background worker to a temporary file and renamed over the old one, so it's never left half written.
+
+	Attributes:
+		path(Path): File to write settings to.
+		delay(int): Time in ms settings have to stop changing for before they are written.
+		_worker(Background_Worker): Worker writing our file.
+		_settings(obs_data_t): Settings waiting to be written. None if nothing is waiting.
+		_last_written(str): JSON of the settings we last wrote or loaded.
+		_lock(Lock): Makes sure only one thread writes our file at a time.
+		_version(int): Bumped for every write, so a slow background write never replaces newer settings.
+		_written_version(int): Version of the settings in our file.
+	'''
+
+	def __init__(self, path:Path, worker:Background_Worker, delay:int=500) -> None:
+		self.path = path
+		self.delay = delay
+		self._worker = worker
+		self._settings = None
+		self._last_written = None
+		self._lock = Lock()
+		self._version = 0
+		self._written_version = 0
+
+	def loaded(self, settings_json:str) -> None:
+		''' Lets us know what is already in our file, so saving the same settings doesn't write it again.
+
+		Arguments:
+			settings_json(str): Contents of our file.
+		'''
+		self._last_written = settings_json
+
+	def save(self, settings) -> None:
+		''' Saves settings once they haven't changed for our delay. Every call restarts the delay.
+
+		Arguments:
+			settings(obs_data_t): Settings to save.
+		'''
+		self._settings = settings
+		obs.timer_remove(settings_writer_tick)
+		obs.timer_add(settings_writer_tick, self.delay)
+
+	def write_pending(self, wait:bool=False) -> None:
+		''' Writes any settings waiting to be saved if they changed since we last wrote them. Must be called on the OBS thread.
+
+		Arguments:
+			wait(bool=False): Writes on this thread instead of our worker, i.e. when OBS is saving or unloading the script.
+		'''
+		obs.timer_remove(settings_writer_tick)
+		if self._settings is None:
+			return
+
+		settings_json = obs.obs_data_get_json(self._settings)
+		self._settings = None
+		if settings_json == self._last_written:
+			return
+		self._last_written = settings_json
+		self._version += 1
+
+		if wait:
+			self._write(settings_json, self._version)
+		else:
+			self._worker.submit(self._write, settings_json, self._version)
+
+	def _write(self, settings_json:str, version:int) -> None:
+		''' Writes settings to a temporary file, then replaces our file with it.
+
+		Arguments:
+			settings_json(str): Settings to write.
+			version(int): Version of these settings. Nothing is written if our file already has newer settings.
+		'''
+		temp_path = self.path.with_name(self.path.name + '.tmp')
+		with self._lock:
+			if version < self._written_version:
+				return
+			self._written_version = version
+
+			try:
+				with open(temp_path, 'w', encoding='utf-8') as settings_file:
+					settings_file.write(settings_json)
+				replace_file(temp_path, self.path)
+			except Exception as e:
+				print(e, f'Unable to save settings to `{self.path}`')
+				return
+		print(f'Settings file `{self.path}` updated.')
+
+
+def settings_writer_tick():
+	''' OBS timer callback for Data.SettingsWriter, called once settings stop changing.
+	'''
+	Data.SettingsWriter.write_pending()
+
+def warm_start_tick():
+	''' OBS timer callback for Data.restore_state, restoring our last session's state once it has been read.
+	'''
+	Data.restore_state()
+
+
+# Trigger server used to spin wheels from bots and stream decks
+########################################
+
+class Trigger_Server:
+	''' A small HTTP server on localhost, so bots and stream decks can spin our wheels without simulating hotkeys.
+
+	The server runs an asyncio loop on its own thread. Requests that touch OBS are put on a queue that trigger_server_tick empties on the OBS thread, and are answered once they're done.
+	Previews only use a wheel's randomizer, so they're generated off the OBS thread. Connections are kept alive, so a client can send many requests without reconnecting.
+
+	Every endpoint answers with JSON, and takes an optional `wheel` query with the number of the wheel, starting at 1:
+		/spin: Spins the wheel. Answers with what happened to the trigger in `trigger`, see Wheel.last_trigger, and with the final phrase in `phrase` if a spin started.
+		/show: Shows the wheel's phrase again.
+		/preview?count=N: Answers with N random phrases, without spinning or dealing from the wheel's deck.
+
+	Attributes:
+		port(int): Port we're listening on. None while we're stopped.
+		_requests(Queue): (action, wheel index, Future) for every request waiting for the OBS thread.
+		_loop(AbstractEventLoop): Our event loop. None while we're stopped.
+		_thread(Thread): Thread running our loop. None while we're stopped.
+		_tasks(set): Tasks serving our open connections.
+	'''
+
+	HOST = '127.0.0.1'
+	TICK_INTERVAL = 10 # Interval in ms of trigger_server_tick. OBS runs timers once per video frame, so requests wait at most a frame.
+	TIMEOUT = 5 # Seconds to wait for the OBS thread before giving up on a request
+	MAX_PREVIEW_COUNT = 1000
+
+	def __init__(self) -> None:
+		self.port = None
+		self._requests = Queue()
+		self._loop = None
+		self._thread = None
+		self._tasks = set()
+
+	def start(self, port:int) -> None:
+		''' Starts listening on a port, stopping first if we're already running. If we can't listen (i.e. the port is in use), the error is printed and we stay stopped.
+
+		Arguments:
+			port(int): Port to listen on. 0 picks any free port, see self.port.
+		'''
+		self.stop()
+
+		started = Future()
+		self._thread = Thread(target=self._run, args=(port, started), name=f'{PROJECT_NAME}-triggers', daemon=True)
+		self._thread.start()
+		try:
+			self.port = started.result(self.TIMEOUT)
+		except Exception as e:
+			print(e, f'Unable to start the trigger server on port {port}')
+			self.stop()
+			return
+
+		obs.timer_add(trigger_server_tick, self.TICK_INTERVAL)
+		print(f'Trigger server listening on http://{self.HOST}:{self.port}')
+
+	def stop(self) -> None:
+		''' Stops our server. Requests still waiting for the OBS thread are cancelled.
+		'''
+		if self._thread is None:
+			return
+
+		obs.timer_remove(trigger_server_tick)
+		if self._loop is not None and self._thread.is_alive():
+			self._loop.call_soon_threadsafe(self._loop.stop)
+		self._thread.join(self.TIMEOUT)
+		self._thread = None
+		self._loop = None
+		self.port = None
+
+		while True:
+			try:
+				_, _, future = self._requests.get_nowait()
+			except Empty:
+				break
+			future.cancel()
+
+	def handle_requests(self) -> None:
+		''' Handles every request waiting for the OBS thread. Must be called on the OBS thread, see trigger_server_tick.
+		'''
+		while True:
+			try:
+				action, index, future = self._requests.get_nowait()
+			except Empty:
+				return
+
+			if not future.set_running_or_notify_cancel():
+				continue
+			try:
+				future.set_result(action(self._wheel(index)))
+			except Exception as e:
+				future.set_exception(e)
+
+	@staticmethod
+	def _wheel(index:int) -> 'Wheel':
+		''' Returns the wheel at index.
+
+		Raises:
+			LookupError: If we don't have a wheel at index.
+		'''
+		if not 0 <= index < len(Data.Wheels):
+			raise LookupError(f'No wheel {index + 1}, there are {len(Data.Wheels)} wheels.')
+		return Data.Wheels[index]
+
+	@staticmethod
+	def _spin(wheel:'Wheel') -> dict:
+		''' Spins a wheel. Runs on the OBS thread.
+		'''
+		phrase = wheel.randomize_text()
+		if phrase is None:
+			return {'wheel': wheel.index + 1, 'trigger': wheel.last_trigger}
+		return {'wheel': wheel.index + 1, 'trigger': wheel.last_trigger, 'phrase': phrase}
+
+	@staticmethod
+	def _show(wheel:'Wheel') -> dict:
+		''' Shows a wheel's phrase again. Runs on the OBS thread.
+		'''
+		wheel.on_click_show_phrase_again()
+		return {'wheel': wheel.index + 1}
+
+	def _preview(self, index:int, count:int) -> dict:
+		''' Generates random phrases with a wheel's randomizer. Runs off the OBS thread, as it doesn't touch OBS.
+		'''
+		wheel = self._wheel(index)
+		with wheel.Spins.lock:
+			return {'wheel': index + 1, 'phrases': wheel.Randomizer.get_dummy_phrases(count)}
+
+	def _run(self, port:int, started:Future) -> None:
+		''' Runs our event loop until we're stopped. This is our thread's target.
+
+		Arguments:
+			port(int): Port to listen on.
+			started(Future): Given the port we're listening on once we are, or the error that stopped us.
+		'''
+		loop = asyncio.new_event_loop()
+		asyncio.set_event_loop(loop)
+		self._loop = loop
+
+		try:
+			server = loop.run_until_complete(asyncio.start_server(self._connected, self.HOST, port))
+		except OSError as e:
+			loop.close()
+			started.set_exception(e)
+			return
+		started.set_result(server.sockets[0].getsockname()[1])
+
+		try:
+			loop.run_forever()
+		finally:
+			server.close()
+			for task in self._tasks:
+				task.cancel()
+			loop.run_until_complete(asyncio.gather(server.wait_closed(), *self._tasks, return_exceptions=True))
+			self._tasks.clear()
+			loop.close()
+
+	def _connected(self, reader, writer) -> None:
+		''' Called by our server for every new connection. Serves it in a task we keep track of, so it can be cancelled when we stop.
+		'''
+		task = self._loop.create_task(self._serve(reader, writer))
+		self._tasks.add(task)
+		task.add_done_callback(self._tasks.discard)
+
+	async def _serve(self, reader, writer) -> None:
+		''' Answers the requests of a connection until it's closed.
+		'''
+		try:
+			while True:
+				request_line = await reader.readline()
+				if not request_line:
+					break
+
+				headers = {}
+				while True:
+					line = await reader.readline()
+					if line in (b'\r\n', b'\n', b''):
+						break
+					name, _, value = line.decode('latin-1').partition(':')
+					headers[name.strip().lower()] = value.strip()
+
+				# We don't use bodies, but they have to be read to get to the next request
+				length = int(headers.get('content-length') or 0)
+				if length:
+					await reader.readexactly(length)
+
+				method_target_version = request_line.decode('latin-1').split()
+				status, body = await self._respond(method_target_version[1] if len(method_target_version) > 1 else '/')
+
+				keep_alive = headers.get('connection', '').lower() != 'close' and method_target_version[-1:] != ['HTTP/1.0']
+				payload = dumps(body).encode('utf-8')
+				writer.write((
+					f'HTTP/1.1 {status}\r\n'
+					'Content-Type: application/json; charset=utf-8\r\n'
+					f'Content-Length: {len(payload)}\r\n'
+					f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+				).encode('latin-1') + payload)
+				await writer.drain()
+
+				if not keep_alive:
+					break
+
+		except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+			pass
+		finally:
+			writer.close()
+
+	async def _respond(self, target:str) -> tuple:
+		''' Handles a request.
+
+		Arguments:
+			target(str): Target of the request, i.e. `/preview?wheel=2&count=5`.
+
+		Returns:
+			(str, dict): The status, i.e. `200 OK`, and the body to answer with.
+		'''
+		url = urlsplit(target)
+		query = parse_qs(url.query)
+		try:
+			index = int(query.get('wheel', ['1'])[0]) - 1
+
+			if url.path == '/preview':
+				count = int(query.get('count', ['1'])[0])
+				if not 1 <= count <= self.MAX_PREVIEW_COUNT:
+					raise ValueError(f'count must be from 1 to {self.MAX_PREVIEW_COUNT}.')
+				result = await self._loop.run_in_executor(None, self._preview, index, count)
+
+			elif url.path in ('/spin', '/show'):
+				future = Future()
+				self._requests.put((self._spin if url.path == '/spin' else self._show, index, future))
+				result = await asyncio.wait_for(asyncio.wrap_future(future), self.TIMEOUT)
+
+			else:
+				return '404 Not Found', {'error': f'Unknown endpoint `{url.path}`, use /spin, /show or /preview.'}
 
-		# Now we need to update our phrase lists
-		self.update_phrases()
+		except ValueError as e:
+			return '400 Bad Request', {'error': str(e)}
+		except LookupError as e:
+			return '404 Not Found', {'error': str(e)}
+		except asyncio.TimeoutError:
+			return '504 Gateway Timeout', {'error': 'OBS took too long to handle the request.'}
+		except Exception as e:
+			return '500 Internal Server Error', {'error': str(e)}
 
-	def update_phrases(self) -> None:
-		''' Updates the working copy of phrases with our master list.
+		return '200 OK', result
 
-		Typically used when we're changing our phrase duplication setting, or updating our phrases master list.
-		'''
-		# If we're duplicating, we're just setting our internal list as a pointer to our external list
-		if self._phrase_duplication:
-			self._phrases = self._phrases_master
 
-		# Otherwise, we're going to copy our phrases
-		else:
-			self._phrases = self._phrases_master.copy()
+def trigger_server_tick():
+	''' OBS timer callback for Data.Triggers, handling requests from our trigger server on the OBS thread.
+	'''
+	Data.Triggers.handle_requests()
 
 
 # Language class to help manage language translation
@@ -281,17 +2932,42 @@ class Data:
 	# Required variables
 	props = None
 	settings = None
+	applied_settings = {} # Values of every setting in SETTING_TYPES when script_update last ran
 
-	# Creating our language translator
+	# Our language translator, created in Data.initialize()
 	lang_code = 'en'
-	lang = Lang(lang_code)
+	lang = None
 
-	phrases = []
-	phrases_unique = False
-	source_name = ''
+	phrases_unique = False # Default of every wheel
 	phrase_lifetime = 8000
 	lists_dir = SCRIPT_DIRECTORY / 'lists'
-	Randomizer = Phrase_Randomizer(lists_dir)
+	phrases_dir = SCRIPT_DIRECTORY / 'phrases'
+	Worker     = Background_Worker()
+	SettingsWriter = Settings_Writer(SCRIPT_SETTINGS_FILE, Worker)
+	Lists      = None # Created in Data.initialize(), shared by every wheel
+	Pools      = None # Phrase files, created in Data.initialize() and shared by every wheel
+	Scheduler  = Frame_Scheduler()
+	Metrics    = Spin_Metrics()
+	Sources    = Source_Cache()
+	TextSources = Text_Source_Index()
+	Triggers   = Trigger_Server()
+
+	# Wheels, each spinning on its own source. See Wheel.
+	wheel_count = 1
+	Wheels      = []
+
+	# Warm start settings
+	warm_start_enabled = True
+	warm_start = None # Future of the state being read from SCRIPT_STATE_FILE by Data.load_state, until Data.restore_state restores it
+	state_file = SCRIPT_STATE_FILE
+
+	# Trigger settings, see Spin_Queue
+	trigger_policy      = 'coalesce'
+	trigger_queue_depth = 3
+
+	# Trigger server settings
+	trigger_server_enabled = False
+	trigger_server_port    = 4477
 
 	# Animation Settings
 	animation_enabled      = True
@@ -301,27 +2977,133 @@ class Data:
 	animation_deceleration = 52
 	separate_list_shuffle  = False
 	interanimation_length  = 4000
+	frame_times, end_time  = animation_frame_times(animation_length, animation_deceleration)
 
 	# Sound settings
 	start_sound_enabled = True
 	start_sound_path    = SCRIPT_DIRECTORY / 'sounds' / 'wheel.mp3'
 	end_sound_enabled   = True
 	end_sound_path      = SCRIPT_DIRECTORY / 'sounds' / 'alert.mp3'
-	output_index = 63 # Last index
+	output_index = 63 # Last index, every wheel after the first uses the index before the last wheel's
+
+	@staticmethod
+	def initialize():
+		''' One-time setup of everything that reads from disk. Deferred until script_load so OBS can import the script quickly.
+
+		Calling this again does nothing.
+		'''
+		if Data.Lists is not None:
+			return
+
+		Data.lang  = Lang(Data.lang_code)
+		Data.Lists = List_Cache(Data.lists_dir, Data.Worker)
+		Data.Pools = List_Cache(Data.phrases_dir, Data.Worker, phrases=True)
+		Data.load_settings()
+
+	@staticmethod
+	def set_wheel_count(count:int, settings):
+		''' Adds or removes wheels until we have count of them. Removed wheels release everything they hold on to.
+
+		Arguments:
+			count(int): Number of wheels, from 1 to MAX_WHEELS.
+			settings(obs_data): Script settings, where the hotkeys of new wheels are saved.
+		'''
+		count = max(1, min(count, MAX_WHEELS))
+		while len(Data.Wheels) < count:
+			Data.Wheels.append(Wheel(len(Data.Wheels), settings))
+		while len(Data.Wheels) > count:
+			Data.Wheels.pop().clear()
+
+	@staticmethod
+	def save_state():
+		''' Saves which lists and phrase files are loaded, and where every wheel's deck is, to Data.state_file, so the next session can start where this one left off.
+
+		Only names, file stats and decks are saved. The next session loads lists again from their files, sidecar indexes and packs, and compiles our phrases again. The file is written as JSON on our worker.
+		'''
+		if not Data.warm_start_enabled or Data.Lists is None:
+			return
+
+		state = {
+			'version': STATE_VERSION,
+			'lists': Data.Lists.get_state(),
+			'pools': Data.Pools.get_state(),
+			'wheels': [wheel.get_state() for wheel in Data.Wheels],
+		}
+		Data.Worker.submit(Data.write_state, state, Data.state_file)
+
+	@staticmethod
+	def write_state(state:dict, path:Path):
+		''' Writes a state from Data.save_state to a temporary file, then replaces our state file with it. Runs on our worker.
+		'''
+		temp_path = path.with_name(path.name + '.tmp')
+		try:
+			with open(temp_path, 'w', encoding='utf-8') as state_file:
+				state_file.write(dumps(state))
+			replace_file(temp_path, path)
+		except (OSError, TypeError, ValueError) as e:
+			print(e, f'Unable to save state to `{path}`')
+
+	@staticmethod
+	def load_state():
+		''' Starts reading the state saved by Data.save_state on our worker. Data.restore_state restores it once it's read and our settings are known.
+		'''
+		Data.warm_start = Data.Worker.submit(Data.read_state, Data.state_file)
+		obs.timer_add(warm_start_tick, 100)
+
+	@staticmethod
+	def read_state(path:Path):
+		''' Returns the state saved in our state file, or None if there isn't one we can use. Runs on our worker.
+		'''
+		if not path.is_file():
+			return None
+
+		try:
+			with open(path, 'r', encoding='utf-8') as state_file:
+				state = loads(state_file.read())
+		except (OSError, ValueError) as e:
+			print(e, f'Unable to load state from `{path}`')
+			return None
+
+		if isinstance(state, dict) and state.get('version') == STATE_VERSION:
+			return state
+		return None
+
+	@staticmethod
+	def restore_state():
+		''' Restores the state read by Data.load_state, with whatever is still valid. Does nothing until it has been read.
+
+		Lists and phrase files from our last session are loaded again on our worker, and every wheel picks up where its deck left off.
+		'''
+		if Data.warm_start is None or not Data.warm_start.done():
+			return
+
+		obs.timer_remove(warm_start_tick)
+		state, Data.warm_start = Data.warm_start.result(), None
+		if state is None or not Data.warm_start_enabled:
+			return
+
+		try:
+			Data.Worker.submit(Data.Lists.restore_state, state['lists'])
+			Data.Worker.submit(Data.Pools.restore_state, state['pools'])
+			for wheel, wheel_state in zip(Data.Wheels, state['wheels']):
+				wheel.restore_state(wheel_state)
+		except (KeyError, TypeError, ValueError) as e:
+			print(e, f'Unable to restore state from `{Data.state_file}`')
 
 	@staticmethod
-	def save_settings():
-		''' Saves settings to the SCRIPT_SETTINGS file into Data.settings.
+	def save_settings(flush:bool=False):
+		''' Saves Data.settings to the SCRIPT_SETTINGS file.
+
+		Saves are debounced and written in the background. See Settings_Writer for more details.
+
+		Arguments:
+			flush(bool=False): Writes the settings now, on this thread. Used when OBS saves or unloads the script.
 		'''
 		# Checking if we have settings to save
 		if Data.settings:
-			# Attempting to write out settings
-			try:
-				with open(SCRIPT_SETTINGS_FILE, 'w', encoding='utf-8') as settings_file:
-					settings_file.write(obs.obs_data_get_json(Data.settings))
-			except Exception as e:
-				print(e, f'Unable to save settings to `{SCRIPT_SETTINGS_FILE}`')
-		print(f'Settings file `{SCRIPT_SETTINGS_FILE}` updated.')
+			Data.SettingsWriter.save(Data.settings)
+		if flush:
+			Data.SettingsWriter.write_pending(wait=True)
 
 	@staticmethod
 	def load_settings():
@@ -330,7 +3112,9 @@ class Data:
 		if SCRIPT_SETTINGS_FILE.is_file():
 			# If our settinsg exist, we load the file
 			with open(SCRIPT_SETTINGS_FILE, 'r', encoding='utf-8') as settings_file:
-				Data.settings = obs.obs_data_create_from_json(settings_file.read())
+				settings_json = settings_file.read()
+			Data.settings = obs.obs_data_create_from_json(settings_json)
+			Data.SettingsWriter.loaded(settings_json)
 
 			# If our language exists in our settings file, we load that language
 			lang_code = obs.obs_data_get_string(Data.settings, 'lang')
@@ -374,9 +3158,6 @@ class Hotkey:
 		obs.obs_data_array_release(self.hotkey_saved_key)
 
 
-class HotkeyStore:
-	htk_copy = None
-
 # ------------------------------------------------------------
 
 class OBS_Source:
@@ -389,20 +3170,33 @@ class OBS_Source:
 
 		This will get a reference to ths source using the proper methods, as well as create dummy data for you to fill. See class methods for more details.
 
-		This defaults to opening the source with the name in Data.source_name.
+		This opens the source named self.source_name.
+		'''
+		return self.open()
+
+	def __exit__(self, _, __, ___):
+		''' Closing statement for keyword 'with' usage. See self.__enter__ for more details.
+		'''
+		self.close()
+
+	def open(self):
+		''' Gets a reference to our source. Used when the source needs to stay open longer than a 'with' block, i.e. across animation frames.
+
+		Every call must be matched with a call to self.close().
 		'''
-		self._obs_source = obs.obs_get_source_by_name(self.source_name)
+		self._obs_source = Data.Sources.get(self.source_name)
 
 		if self._obs_source is None:
 			raise Exception(f'Could not find source with name {self.source_name}')
 
 		return self
 
-	def __exit__(self, _, __, ___):
-		''' Closing statement for keyword 'with' usage. See self.__enter__ for more details.
+	def close(self):
+		''' Releases our reference to the source. See self.open for more details.
 		'''
-		obs.obs_source_release(self._obs_source)
-		self._obs_source = None
+		if self._obs_source is not None:
+			obs.obs_source_release(self._obs_source)
+			self._obs_source = None
 
 	def _check_source(self):
 		''' Checks if we have a valid source. If we don't, this function raises a ValueError detailing that we don't have a valid source set.
@@ -430,15 +3224,52 @@ class OBS_Source:
 		finally:
 			obs.obs_data_release(source_data)
 
+	def update(self, source_data):
+		''' Updates the source with obs_data we already have. The data isn't released, so it can be used again.
+
+		Arguments:
+			source_data(obs_data): Data to update the source with, i.e. a frame from OBS_Source.create_text_frames().
+		'''
+		self._check_source()
+		obs.obs_source_update(self._obs_source, source_data)
+
 	def set_text(self, new_text:str=''):
-		''' Convinence function to quickly update the text. Utalizes obs_source.set_data().
+		''' Convinence function to quickly update the text. Builds the data directly rather than going through JSON like obs_source.set_data().
 
 		Arguments:
 			new_text(str=''): String that contains the new text. This defaults to an emptry string to remove text data from the source.
 		'''
-		self.set_data({
-			'text': new_text
-		})
+		frames = OBS_Source.create_text_frames([new_text])
+		try:
+			self.update(frames[0])
+		finally:
+			OBS_Source.release_frames(frames)
+
+	@staticmethod
+	def create_text_frames(text_list:list) -> list:
+		''' Builds an obs_data object holding each text, ready to be passed to update().
+
+		Building these before an animation starts keeps allocations and JSON parsing out of every frame. They must be released with OBS_Source.release_frames().
+
+		Arguments:
+			text_list([str]): Text for every frame.
+		'''
+		frames = []
+		for text in text_list:
+			frame = obs.obs_data_create()
+			obs.obs_data_set_string(frame, 'text', text)
+			frames.append(frame)
+		return frames
+
+	@staticmethod
+	def release_frames(frames:list):
+		''' Releases frames created by OBS_Source.create_text_frames().
+
+		Arguments:
+			frames([obs_data]): Frames to release.
+		'''
+		for frame in frames:
+			obs.obs_data_release(frame)
 
 	def set_opacity(self, opacity:int=0):
 		''' Convinence function to quickly update the opacity. Utalizes obs_source.set_data().
@@ -451,216 +3282,625 @@ class OBS_Source:
 		})
 
 
-	def text_animation(self, length:float, deceleration_scale:float, text_list:list):
-		''' Plays a budget text animation by changing the source's text value with a delay following the slope of a cubic.
 
-		I've played around with this function for many an hour to perfect. I've landed on a cubic function modeled by this wolframapha link.
-		https://www.wolframalpha.com/input?i=52+*+%28x+%2F+8000+*+2%29+%5E+%281%2F4%29
-		Where deceleration_scale is 52 and length is 8000 (8 seconds)
-		This functions always starts with very fast delays and slows down as the index increases.
+class Text_Animation:
+	''' A single spin of the wheel, played one frame at a time by the frame scheduler.
+
+	The animation moves through its frames as the scheduler calls it, so starting it returns immediately.
+	Every frame is scheduled from the time the animation started, so slow ticks never add up into drift.
+
+	Attributes:
+		source(OBS_Source): The source to animate. It is kept open for the whole animation.
+		final_phrase(str): Text displayed once the animation finishes.
+		text_list([str]): Text to use as examples in the animation.
+		frame_times([float]): Offset in ms from the start of the animation of every frame.
+		end_time(float): Offset in ms from the start of the animation of the final phrase.
+		on_finish(callable): Called with no arguments once the final phrase is displayed.
+		spin: Key the animation's stages are marked with in Data.Metrics.
+		_start(float): Monotonic time the animation started at.
+		_frame(int): Index of the next frame to display.
+		_frames([obs_data]): Pre-built data for every text in text_list, followed by the final phrase. Built when the animation starts.
+		_cancelled(bool): If the animation was stopped with cancel(). Frames that are still scheduled do nothing.
+	'''
+
+	def __init__(self, source:OBS_Source, final_phrase:str, text_list:list, frame_times:list, end_time:float, on_finish=None, spin=None) -> None:
+		''' Prepares an animation. Use start() to play it.
 
 		Arguments:
-			length(float): The length of the animation in ms.
-			deceleration_scale(float): The scale at which to decelerate.
-			text_list(list): A list of text to use as text examples in animation. Length must be more than 1.
+			source(OBS_Source): The source to animate. It doesn't need to be opened.
+			final_phrase(str): Text displayed once the animation finishes.
+			text_list(list): A list of text to use as text examples in animation. Length must be more than 1 if there are any frames.
+			frame_times([float]): Offsets of every frame in ms. See animation_frame_times.
+			end_time(float): Offset in ms of the final phrase.
+			on_finish(callable=None): Called once the final phrase is displayed.
+			spin(=None): Key the animation's stages are marked with in Data.Metrics, i.e. the index of its wheel.
 		'''
-		print('Playing animation')
-		animation_length = length
-
 		# Raising an error if our list is not less than 1
-		num_texts = len(text_list)
-		if not num_texts > 1:
+		if frame_times and not len(text_list) > 1:
 			raise ValueError('Size of text_list must be more than 1')
 
-		# Playing our animation. Capping our animation after 800 loops to prevent an infinite loop
-		for deceleration_index in range(1, 400):
-			anim_delay = (deceleration_index ** 4) / (animation_length * deceleration_scale)
+		self.source = source
+		self.final_phrase = final_phrase
+		self.text_list = text_list
+		self.frame_times = frame_times
+		self.end_time = end_time
+		self.on_finish = on_finish
+		self.spin = spin
 
-			# Sleeping, then continuing if we have time remaining
-			length = length - anim_delay
-			sleep(anim_delay / 1000)
+		self._start = None
+		self._frame = 0
+		self._frames = []
+		self._cancelled = False
 
-			# Displaying a random phrase unless our time is too short
-			if length < 0:
-				break
+	def start(self, scheduler:Frame_Scheduler) -> None:
+		''' Opens our source, makes it visible and schedules the first frame.
 
-			# Setting our text
-			self.set_text(
-				text_list[deceleration_index % num_texts]
-			)
+		Arguments:
+			scheduler(Frame_Scheduler): Scheduler to play the animation on.
+		'''
+		print('Playing animation')
+		self._scheduler = scheduler
 
-def source_delayed_hide():
-	''' Hides the source immediatly, but is de-referenced from obs-source to allow for the use of timers.
-	'''
-	# Removing any timers for this method
-	obs.remove_current_callback()
+		# Building all our frames up front, so each frame is just an update
+		self._frames = OBS_Source.create_text_frames(self.text_list + [self.final_phrase])
 
-	# Setting our source opacity to 0
-	with OBS_Source(Data.source_name) as source:
-		source.set_opacity(0)
+		try:
+			self.source.open()
+			self.source.set_opacity(100)
+		except Exception:
+			OBS_Source.release_frames(self._frames)
+			self.source.close()
+			raise
+
+		self._start = monotonic()
+		self._schedule_next()
+
+	def _schedule_next(self) -> None:
+		''' Schedules our next frame, or the final phrase if we're out of frames.
+		'''
+		if self._frame < len(self.frame_times):
+			self._scheduler.call_at(self._start + self.frame_times[self._frame] / 1000, self._next_frame)
+		else:
+			self._scheduler.call_at(self._start + self.end_time / 1000, self._finish)
 
-def source_spin_wheel(final_phrase:str, phrase_animation_list:list=None):
-	''' This function will ranzomise the text on screen.
+	def cancel(self) -> None:
+		''' Stops the animation where it is, without displaying the final phrase or calling on_finish. Our source is closed right away.
+		'''
+		if self._cancelled or self._start is None:
+			return
+		self._cancelled = True
+		OBS_Source.release_frames(self._frames)
+		self._frames = []
+		self.source.close()
 
-	This requires phrase_animation_list to be populated as well as Data.animation_enabled for the animation to play
+	def _next_frame(self) -> None:
+		''' Displays the latest frame that is due. Frames we were too late for are skipped rather than played late.
+		'''
+		if self._cancelled:
+			return
 
-	Arguments:
-		final_phrase(str): This is the final message presented on screen after any animation plays.
-		phrase_animation_list(list[str]=None): This is a list of messages to display durin the animation. If this is not given, the animation will not play.
-	'''
-	print('Spinning wheel')
+		elapsed = (monotonic() - self._start) * 1000
+		while self._frame + 1 < len(self.frame_times) and self.frame_times[self._frame + 1] <= elapsed:
+			self._frame += 1
 
-	# Playing our start sound if requested
-	if Data.start_sound_enabled:
-		play_sound(Data.start_sound_path)
+		Data.Metrics.mark('first_frame', self.spin)
+		Data.Metrics.record('frame_lateness', elapsed - self.frame_times[self._frame])
 
-	# Opening our source and making it visible
-	with OBS_Source(Data.source_name) as source:
-		source.set_opacity(100)
+		# Frames start at an index of 1, matching the text chosen by the original animation loop
+		try:
+			self.source.update(self._frames[(self._frame + 1) % len(self.text_list)])
+		except Exception:
+			self._finish()
+			raise
 
-		# Playing our animation if requested.
-		if Data.animation_enabled:
-			source.text_animation(
-				Data.animation_length, # In ms
-				Data.animation_deceleration,
-				phrase_animation_list
-			)
+		self._frame += 1
+		self._schedule_next()
 
-		# Displaying the final phrases
-		print(f'Setting pre-final phrase to {final_phrase}')
-		source.set_text(final_phrase)
+	def _finish(self) -> None:
+		''' Displays the final phrase, closes our source and lets our caller know we're done.
+		'''
+		if self._cancelled:
+			return
 
-	# Close OBS Source
+		try:
+			print(f'Setting pre-final phrase to {self.final_phrase}')
+			self.source.update(self._frames[-1])
+			Data.Metrics.mark('first_frame', self.spin)
+			Data.Metrics.record('frame_lateness', (monotonic() - self._start) * 1000 - self.end_time)
+		finally:
+			OBS_Source.release_frames(self._frames)
+			self._frames = []
+			self.source.close()
+			if self.on_finish is not None:
+				self.on_finish()
 
-	# Playing our end sound
-	if Data.end_sound_enabled:
-		play_sound(Data.end_sound_path)
 
-def source_randomize_text():
-	''' Updates the text displayed in the source.
+# Wheels, each spinning phrases on its own text source
+########################################
 
-	This uses the phrase randomizer to generate the phrases used in the animation as well as the chosen phrase.
+class Wheel:
+	''' A wheel spinning phrases on its own text source, with its own phrases, hotkeys and spin state.
 
-	This function is also in charge of removing the phrase from our internal list if requested.
+	Every wheel shares Data.Lists, Data.Scheduler and Data.Worker, so any number of wheels spin at once on one timer and one copy of every list.
+	Wheels only have their own settings for what's in WHEEL_SETTING_TYPES, everything else comes from Data.
 
+	Attributes:
+		index(int): Position of the wheel, starting at 0.
+		source_name(str): Name of the text source the wheel spins on.
+		phrases([str]): Phrases of the wheel.
+		phrases_file(str): Name of the file in Data.phrases_dir the wheel takes its phrases from instead. Empty if the wheel uses its phrases.
+		phrases_unique(bool): If the wheel only gives unique phrases.
+		Randomizer(Phrase_Randomizer): Randomizer of the wheel's phrases, filled from Data.Lists.
+		Spins(Spin_Buffer): Spins of the wheel generated ahead of time.
+		Sounds(Sound_Pool): Sounds of the wheel, on its own output channel so sounds of different wheels can overlap.
+		Queue(Spin_Queue): Decides what happens to triggers while the wheel is spinning.
+		spinning(bool): If the wheel is spinning.
+		last_trigger(str): What happened to the last trigger, `started` or one of Spin_Queue.offer's results.
+		_spin(int): Bumped every time a spin starts or is stopped, so the stages of a stopped spin never play.
+		_animation(Text_Animation): Animation currently playing. None if there isn't one.
+		_hide_callback(callable): Our hide timer. OBS removes timers by their callback, so it's always given this same bound method.
+		_hotkeys([Hotkey]): Hotkeys to spin the wheel and to show its phrase again.
+		_updated(bool): If the wheel has had the script's settings applied yet.
 	'''
-	print('Randomizing source text')
 
-	# Removing any callback to the delayed hide for our source
-	obs.timer_remove(source_delayed_hide)
+	def __init__(self, index:int, settings) -> None:
+		''' Creates a wheel and registers its hotkeys.
+
+		Arguments:
+			index(int): Position of the wheel, starting at 0.
+			settings(obs_data): Script settings, where the wheel's hotkeys are saved.
+		'''
+		self.index = index
+		self.source_name = ''
+		self.phrases = []
+		self.phrases_file = ''
+		self.phrases_unique = Data.phrases_unique
+
+		self.Randomizer = Phrase_Randomizer(Data.lists_dir, Data.Worker, Data.Lists)
+		self.Spins      = Spin_Buffer(self.Randomizer, Data.Worker)
+		self.Sounds     = Sound_Pool(Data.output_index - index)
+
+		self.Queue        = Spin_Queue(Data.trigger_policy, Data.trigger_queue_depth)
+		self.spinning     = False
+		self.last_trigger = None
+		self._spin        = 0
+		self._animation   = None
+
+		self._hide_callback = self.delayed_hide
+		self._updated = False
+
+		# The first wheel keeps the hotkeys it had before there were wheels
+		self._hotkeys = [
+			Hotkey(self.on_hotkey_get_random_phrase, settings, self.setting_key('get_random_text', index), self.label(Data.lang.t('get_random'))),
+			Hotkey(self.on_hotkey_show_phrase_again, settings, self.setting_key('show_phrase_again', index), self.label(Data.lang.t('show_phrase'))),
+		]
+
+	@staticmethod
+	def setting_key(key:str, index:int) -> str:
+		''' Returns the key of one of a wheel's settings. The first wheel uses the keys from before there were wheels, so existing settings carry over.
+
+		Arguments:
+			key(str): Key of the setting, i.e. `source`.
+			index(int): Position of the wheel.
+		'''
+		return key if index == 0 else f'{key}_{index + 1}'
+
+	def label(self, text:str) -> str:
+		''' Returns text labelled with our wheel, i.e. for our hotkeys. The first wheel's text is left as it is.
+
+		Arguments:
+			text(str): Text to label.
+		'''
+		return text if self.index == 0 else f"{text} ({Data.lang.t('wheel')} {self.index + 1})"
+
+	def update(self, values:dict, changed:set) -> None:
+		''' Applies the script's settings to our wheel. Only what changed is rebuilt, except on our first update where everything is.
+
+		Arguments:
+			values(dict): Value of every setting in SETTING_TYPES.
+			changed(set): Keys of the settings that changed since the last update.
+		'''
+		if not self._updated:
+			changed = set(values)
+			self._updated = True
+		source_key, phrases_key, file_key, unique_key = (self.setting_key(key, self.index) for key in WHEEL_SETTING_TYPES)
+
+		# Updating source name, forgetting our old source if it changed
+		if source_key in changed:
+			Data.Sources.invalidate(self.source_name)
+			self.source_name = values[source_key]
+
+		# Gathering our phrases
+		if phrases_key in changed:
+			self.phrases = values[phrases_key].splitlines()
+			self.phrases = [phrase.strip().replace('\\n', '\n') for phrase in self.phrases] # The list comp here is replacing the literal '\n' in the phrases with a newline char
+			# Removing empty strings from list
+			if '' in self.phrases:
+				self.phrases.remove('')
+
+		# Taking our phrases from a phrase file instead, if one is picked
+		self.phrases_file = values[file_key]
+		reload_phrases = bool(changed & {phrases_key, file_key, 'phrases_dir'})
+
+		# User is requesting that we don't duplicate phrases
+		self.phrases_unique = values[unique_key]
+
+		# What happens to triggers while we spin
+		self.Queue.configure(Data.trigger_policy, Data.trigger_queue_depth)
+
+		# Loading our sounds, the pool only reloads sounds whose path changed
+		if changed & {'start_sound_path', 'end_sound_path'}:
+			self.Sounds.set_paths([Data.start_sound_path, Data.end_sound_path])
+
+		# Updating our randomizer, then throwing away any spins prepared with our old settings. Changing anything else keeps our deck as it is.
+		if reload_phrases or changed & {unique_key, 'lists_dir'}:
+			with self.Spins.lock:
+				if unique_key in changed:
+					self.Randomizer.set_phrase_duplication(not self.phrases_unique)
+				if reload_phrases and self.phrases_file:
+					self.Randomizer.set_phrase_pool(Data.Pools, self.phrases_file)
+				elif reload_phrases:
+					self.Randomizer.set_phrase_list(self.phrases)
+				elif 'lists_dir' in changed:
+					self.Randomizer.preload_lists()
+			self.Spins.invalidate()
+		self.Spins.configure(Data.animation_phrase_count, Data.separate_list_shuffle)
+
+	def get_state(self) -> dict:
+		''' Returns the state of our randomizer, see Phrase_Randomizer.get_state.
+		'''
+		with self.Spins.lock:
+			return self.Randomizer.get_state()
+
+	def restore_state(self, state:dict) -> None:
+		''' Restores the state of our randomizer. Spins prepared before it are thrown away first, so their phrases are put back in the deck we're replacing rather than the restored one.
+
+		Arguments:
+			state(dict): State from get_state().
+		'''
+		with self.Spins.lock:
+			self.Spins.clear()
+			self.Randomizer.restore_state(state)
+		self.Spins.fill()
+
+	def save_hotkeys(self) -> None:
+		''' Saves our hotkeys to the script settings.
+		'''
+		for hotkey in self._hotkeys:
+			hotkey.save_hotkey()
+
+	def clear(self) -> None:
+		''' Releases everything our wheel holds on to. Used when the wheel is removed and when the script is unloaded.
+		'''
+		obs.timer_remove(self._hide_callback)
+		for hotkey in self._hotkeys:
+			obs.obs_hotkey_unregister(hotkey.hotkey_id)
+		self._hotkeys = []
+		self.Queue.clear()
+		self.cancel_spin()
+		self.Sounds.clear()
+		self.Spins.clear()
+
+	def cancel_spin(self) -> None:
+		''' Stops the spin we're playing, if we are, without showing its final phrase. Used to preempt a spin with a new one.
+		'''
+		self._spin += 1
+		if self._animation is not None:
+			self._animation.cancel()
+			self._animation = None
+		self.spinning = False
+
+	def delayed_hide(self) -> None:
+		''' Hides the source immediatly, but is de-referenced from obs-source to allow for the use of timers.
+		'''
+		# Removing any timers for this method
+		obs.remove_current_callback()
+
+		# Setting our source opacity to 0
+		with OBS_Source(self.source_name) as source:
+			source.set_opacity(0)
+		Data.Metrics.mark('hide', self.index)
+
+	def spin_wheel(self, final_phrase:str, phrase_animation_list:list=None, on_finish=None) -> None:
+		''' This function will ranzomise the text on screen.
+
+		This requires phrase_animation_list to be populated as well as Data.animation_enabled for the animation to play.
+
+		The animation is played by Data.Scheduler, so this returns immediately. Use on_finish to know when the final phrase is displayed.
 
-	# Waiting for a requested delay
-	if Data.animation_enabled:
-		sleep(Data.animation_delay / 1000) # In ms
+		Arguments:
+			final_phrase(str): This is the final message presented on screen after any animation plays.
+			phrase_animation_list(list[str]=None): This is a list of messages to display durin the animation. If this is not given, the animation will not play.
+			on_finish(callable=None): Called with no arguments once the final phrase is displayed and the end sound started.
+		'''
+		print('Spinning wheel')
+
+		# Getting our frame times if we're animating
+		if Data.animation_enabled and phrase_animation_list:
+			frame_times, end_time = Data.frame_times, Data.end_time
+		else:
+			frame_times, end_time = [], 0
 
-	# Checking if we shuffle names separately
-	if Data.separate_list_shuffle:
-		# Now that we're seperating our list shuffle, we play our shuffle animation twice, but we need to record our final phrase
-		final_phrase = Data.Randomizer.get_phrase(filled=False)
-		source_spin_wheel(
+		def finished():
+			# Playing our end sound
+			if Data.end_sound_enabled:
+				self.play_sound(Data.end_sound_path)
+
+			if on_finish is not None:
+				on_finish()
+
+		animation = Text_Animation(
+			OBS_Source(self.source_name),
 			final_phrase,
-			Data.Randomizer.get_dummy_phrases(Data.animation_phrase_count, filled=False)
+			phrase_animation_list or [],
+			frame_times,
+			end_time,
+			finished,
+			self.index
 		)
+		self._animation = animation
 
-		# Waiting our interanimation duration
-		sleep(Data.interanimation_length / 1000) # In ms
+		# Playing our start sound if requested
+		if Data.start_sound_enabled:
+			self.play_sound(Data.start_sound_path)
 
-		# Playing our animation again, but with filled phrase values
-		source_spin_wheel(
-			Data.Randomizer.fill_phrase(final_phrase),
-			[Data.Randomizer.fill_phrase(final_phrase) for _ in range(Data.animation_phrase_count)]
-		)
+		animation.start(Data.Scheduler)
 
-		# That's it, outside this if block will handle the delayed hide of the source
+	def randomize_text(self) -> str:
+		''' Updates the text displayed in our source.
 
-	# If we're not shuffling out list separately, we just clal once instance of our wheel spin and we're good
-	else:
-		source_spin_wheel(
-			Data.Randomizer.get_phrase(filled=True),
-			Data.Randomizer.get_dummy_phrases(Data.animation_phrase_count, filled=True)
-		)
+		The phrases used in the animation as well as the chosen phrase come from self.Spins, which generates them ahead of time with our randomizer.
+
+		Everything is played by Data.Scheduler, so this returns immediately with the phrase the spin will land on.
+		If we're already spinning, self.Queue decides if the trigger waits for the current spin, is dropped, or stops the current spin for a new one. None is returned unless a new spin starts, see self.last_trigger.
+		'''
+		print('Randomizing source text')
+
+		# Letting our queue decide what happens if we're already spinning
+		if self.spinning:
+			self.last_trigger = self.Queue.offer()
+			Data.Metrics.count(f'triggers_{self.last_trigger}')
+			if self.last_trigger != 'preempted':
+				return None
+			self.cancel_spin()
+
+		self.last_trigger = 'started'
+		self.spinning = True
+		self._spin += 1
+		spin = self._spin
+		Data.Metrics.start_spin(self.index)
+
+		# Removing any callback to the delayed hide for our source
+		obs.timer_remove(self._hide_callback)
+
+		# Getting a spin that's ready to play
+		try:
+			stages = self.Spins.pop()
+		except Exception:
+			self.spin_finished()
+			raise
+
+		# Playing our stages one after the other, waiting our interanimation duration between them
+		def play_stage(index):
+			if index + 1 < len(stages):
+				on_finish = lambda: Data.Scheduler.call_later(Data.interanimation_length, play_stage(index + 1))
+			else:
+				on_finish = self.spin_finished
+			return self.guarded_spin(stages[index], on_finish, spin)
+
+		# Waiting for a requested delay
+		Data.Scheduler.call_later(Data.animation_delay if Data.animation_enabled else 0, play_stage(0))
+		Data.Metrics.mark('trigger', self.index)
+		return stages[-1][0]
+
+	def guarded_spin(self, stage:tuple, on_finish, spin:int):
+		''' Creates a callback for the scheduler that spins the wheel. A failure to start the spin (i.e. a missing source) finishes our spins so we aren't left spinning forever.
+
+		Arguments:
+			stage((str, [str])): The final phrase and animation phrases to pass to spin_wheel.
+			on_finish(callable): Called once the spin finishes.
+			spin(int): The spin the stage is part of. Nothing is played if that spin has been stopped since.
+		'''
+		def start():
+			if spin != self._spin:
+				return
+			try:
+				self.spin_wheel(*stage, on_finish=on_finish)
+			except Exception:
+				self.spin_finished()
+				raise
+		return start
+
+	def spin_finished(self) -> None:
+		''' Called once all of our spins have finished. Sets the hide timer and starts the next spin if one was requested while we were spinning.
+		'''
+		self.spinning = False
+		self._animation = None
+		Data.Metrics.mark('final_frame', self.index)
+
+		# Settings a timer to remove text after delay
+		if Data.phrase_lifetime != 0:
+			obs.timer_add(self._hide_callback, Data.phrase_lifetime)
+
+		# Playing any spin our queue kept while we were busy
+		if self.Queue.take():
+			self.randomize_text()
+
+	def play_sound(self, sound_path) -> None:
+		''' Plays a sound through our sound pool.
+
+		Arguments:
+			sound_path(str): Path of the sound file.
+		'''
+		with Data.Metrics.timed('sound'):
+			self.Sounds.play(sound_path)
+
+	def on_click_get_random_phrase(self, _=None, __=None) -> None:
+		''' When someone clicks the random button on the Scripts settings menu
+		'''
+		print('Random phrase button pressed')
+		# Updates the text
+		self.randomize_text()
 
-	# Settings a timer to remove text after delay
-	if Data.phrase_lifetime != 0:
-		obs.timer_add(source_delayed_hide, Data.phrase_lifetime)
+	def on_hotkey_get_random_phrase(self, pressed) -> None:
+		''' When someone hits the hotkey to generate the random phrase
+		'''
+		print('Random phrase hotkey pressed')
+		if pressed:
+			self.on_click_get_random_phrase()
 
+	def on_click_show_phrase_again(self, _=None, __=None) -> None:
+		''' Shows phrase again for phrase lifetime.
+		'''
+		print('Showing phrase again')
+		# Displaying our phrase
+		with OBS_Source(self.source_name) as source:
+			source.set_opacity(100)
 
-def play_sound(sound_path):
-	# Creating a source and the data for the source with the sound's path
-	sound_source = obs.obs_source_create_private(
-		'ffmpeg_source', 'Global Media Source', None
-	)
-	sound_data = obs.obs_data_create_from_json(dumps({
-		'local_file': sound_path
-	}))
+		# Hiding our phrase after phrase lifetime
+		obs.timer_add(self._hide_callback, Data.phrase_lifetime)
 
-	# Updating our source, and setting a monitoring type for playing
-	obs.obs_source_update(sound_source, sound_data)
-	obs.obs_source_set_monitoring_type(
-		sound_source, obs.OBS_MONITORING_TYPE_MONITOR_AND_OUTPUT
-	)
-	obs.obs_set_output_source(Data.output_index, sound_source)
+	def on_hotkey_show_phrase_again(self, pressed) -> None:
+		''' On hotkey, shows phrase again for the phrase lifetime
+		'''
+		if pressed:
+			self.on_click_show_phrase_again()
 
-	# Releasing our source and our data
-	obs.obs_source_release(sound_source)
-	obs.obs_data_release(sound_data)
+	def on_click_update_phrases(self, _=None, __=None) -> bool:
+		''' Updates our internal phrases list when this button is pressed.
 
+		This lets up keep two phrase lists when phrase_duplication is unchecked. Returns True so OBS refreshes our properties, showing any problems found in our phrases.
+		'''
+		# The randomizer handles all the phrase duplication, so we call their helper function
+		with self.Spins.lock:
+			self.Randomizer.update_phrases()
+		self.Spins.invalidate()
+		return True
+
+	def problems_text(self) -> str:
+		''' Returns the problems found in our phrases as text for our properties. See Phrase_Randomizer.problems.
+		'''
+		return '\n'.join(self.Randomizer.problems()) or Data.lang.t('phrase_problems_none')
 
 
 # Event methods
 ########################################
 
-def on_click_get_random_phrase(_=None, __=None):
-	''' When someone clicks the random button on the Scripts settings menu
+def on_click_dump_metrics(_=None, __=None):
+	''' Writes our spin metrics to SCRIPT_METRICS_FILE.
 	'''
-	print('Random phrase button pressed')
-	# Updates the text
-	source_randomize_text()
+	Data.Metrics.dump(SCRIPT_METRICS_FILE)
 
-def on_hotkey_get_random_phrase(pressed):
-	''' When someone hits the hotkey to generate the random phrase
+def on_click_clear_cache(_, __):
+	''' Clearing our list cache, shared by every wheel, then loading the lists our wheels use again in the background
 	'''
-	print('Random phrase hotkey pressed')
-	if pressed:
-		on_click_get_random_phrase()
+	Data.Lists.clear()
+	for wheel in Data.Wheels:
+		wheel.Randomizer.preload_lists()
 
-def on_click_show_phrase_again(_=None, __=None):
-	''' Shows phrase again for phrase lifetime.
+def on_click_pack_lists(_, __):
+	''' Packing our lists on our background worker, as reading every list can take a while, then loading the lists our wheels use again from the new pack so no spin has to load them
 	'''
-	print('Showing phrase again')
-	# Displaying our phrase
-	with OBS_Source(Data.source_name) as source:
-		source.set_opacity(100)
+	Data.Worker.submit(Data.Lists.pack)
+	for wheel in Data.Wheels:
+		wheel.Randomizer.preload_lists()
+
+def wheel_button(index:int, method:str):
+	''' Returns a button callback calling a method of the wheel at index.
 
-	# Hiding our phrase after phrase lifetime
-	obs.timer_add(source_delayed_hide, Data.phrase_lifetime)
+	Wheels can be added after our properties are made, so the wheel is only looked up once the button is clicked.
 
-def on_hotkey_show_phrase_again(pressed):
-	''' On hotkey, shows phrase again for the phrase lifetime
+	Arguments:
+		index(int): Position of the wheel.
+		method(str): Name of the method, i.e. `on_click_get_random_phrase`.
 	'''
-	if pressed:
-		on_click_show_phrase_again()
+	def on_click(_=None, __=None):
+		if index < len(Data.Wheels):
+			return getattr(Data.Wheels[index], method)()
+	return on_click
 
-def on_click_clear_cache(_, __):
-	''' Clearing our list cache
+def list_phrase_files() -> list:
+	''' Returns the names of the phrase files in our phrases directory, for our properties.
 	'''
-	Data.Randomizer.clear_list_cache()
+	try:
+		return sorted(path.stem for path in Path(Data.phrases_dir).glob('*.txt'))
+	except OSError:
+		return []
 
-def on_click_update_phrases():
-	''' Updates our internal phrases list when this button is pressed.
+def add_phrase_files(props, name:str, phrase_files:list) -> None:
+	''' Adds a dropdown to pick a wheel's phrase file, or to use its phrases instead.
 
-	This lets up keep two phrase lists when phrase_duplication is unchecked.
+	Arguments:
+		props(obs_properties_t): Properties to add the dropdown to.
+		name(str): Name of the setting, see Wheel.setting_key.
+		phrase_files([str]): Names of the phrase files to pick from, see list_phrase_files.
 	'''
-	# The randomizer handles all the phrase duplication, so we call their helper function
-	Data.Randomizer.update_phrases()
+	phrase_file_list = obs.obs_properties_add_list(props,
+		name,
+		Data.lang.t('phrases_file'),
+		obs.OBS_COMBO_TYPE_LIST,
+		obs.OBS_COMBO_FORMAT_STRING)
 
-# ------------------------------------------------------------
+	obs.obs_property_list_add_string(phrase_file_list, Data.lang.t('phrases_file_none'), '')
+	for phrase_file in phrase_files:
+		obs.obs_property_list_add_string(phrase_file_list, phrase_file, phrase_file)
 
-hotkey_get_random = HotkeyStore()
-hotkey_show_phrase = HotkeyStore()
-Data.load_settings()
+def phrase_problems_text(index:int) -> str:
+	''' Returns the problems found in the phrases of the wheel at index, for our properties. Wheels that don't exist yet have none.
 
-# ------------------------------------------------------------
+	Arguments:
+		index(int): Position of the wheel.
+	'''
+	if index < len(Data.Wheels):
+		return Data.Wheels[index].problems_text()
+	return Data.lang.t('phrase_problems_none')
+
+def on_wheel_count_modified(props, _, settings):
+	''' Shows the settings of every wheel in use and hides the rest.
+	'''
+	wheel_count = obs.obs_data_get_int(settings, 'wheel_count')
+	for index in range(1, MAX_WHEELS):
+		obs.obs_property_set_visible(obs.obs_properties_get(props, f'wheel_{index + 1}'), index < wheel_count)
+	return True
+
+def on_source_created(calldata):
+	''' OBS signal for when any source is created. Adds it to our text source index if it's a text source.
+	'''
+	Data.TextSources.add(obs.calldata_source(calldata, 'source'))
+
+def on_source_renamed(calldata):
+	''' OBS signal for when any source is renamed. Forgets the source under its old name, and renames it in our text source index.
+	'''
+	previous_name = obs.calldata_string(calldata, 'prev_name')
+	Data.Sources.invalidate(previous_name)
+	Data.TextSources.rename(previous_name, obs.calldata_string(calldata, 'new_name'))
+
+def on_source_removed(calldata):
+	''' OBS signal for when any source is removed or destroyed. Forgets the source so we never hand it out again or list it.
+	'''
+	source_name = obs.obs_source_get_name(obs.calldata_source(calldata, 'source'))
+	Data.Sources.invalidate(source_name)
+	Data.TextSources.discard(source_name)
+
+SOURCE_SIGNALS = [
+	('source_create',  on_source_created),
+	('source_rename',  on_source_renamed),
+	('source_remove',  on_source_removed),
+	('source_destroy', on_source_removed),
+]
+
+def connect_source_signals(connect:bool=True):
+	''' Connects (or disconnects) our handlers to OBS's global source signals.
+
+	Arguments:
+		connect(bool=True): Connects our handlers if true, disconnects them otherwise.
+	'''
+	signal_handler = obs.obs_get_signal_handler()
+	for signal, callback in SOURCE_SIGNALS:
+		if connect:
+			obs.signal_handler_connect(signal_handler, signal, callback)
+		else:
+			obs.signal_handler_disconnect(signal_handler, signal, callback)
 
 
 
@@ -680,11 +3920,26 @@ def script_defaults(settings):
 	# Language settings defaults
 	obs.obs_data_set_default_string(settings, 'lang', 'en')
 
+	# Wheel defaults, the first wheel's are in the phrases section
+	obs.obs_data_set_default_int(settings, 'wheel_count', Data.wheel_count)
+	for index in range(1, MAX_WHEELS):
+		obs.obs_data_set_default_bool(settings, Wheel.setting_key('phrases_unique', index), Data.phrases_unique)
+
 	# Phrases section
 	obs.obs_data_set_default_string(settings, 'phrases_list',    'Each\nLine\nis\na\nPhrase')
 	obs.obs_data_set_default_bool(  settings, 'phrases_unique',  Data.phrases_unique)
 	obs.obs_data_set_default_int(   settings, 'phrase_lifetime', Data.phrase_lifetime)
 	obs.obs_data_set_default_string(settings, 'lists_dir',       str(Data.lists_dir))
+	obs.obs_data_set_default_string(settings, 'phrases_dir',     str(Data.phrases_dir))
+	obs.obs_data_set_default_bool(  settings, 'warm_start',      Data.warm_start_enabled)
+
+	# Trigger defaults
+	obs.obs_data_set_default_string(settings, 'trigger_policy',      Data.trigger_policy)
+	obs.obs_data_set_default_int(   settings, 'trigger_queue_depth', Data.trigger_queue_depth)
+
+	# Trigger server defaults
+	obs.obs_data_set_default_bool(settings, 'trigger_server_enabled', Data.trigger_server_enabled)
+	obs.obs_data_set_default_int( settings, 'trigger_server_port',    Data.trigger_server_port)
 
 	# Animation settings defaults
 	obs.obs_data_set_default_bool( settings, 'animation_enabled',      Data.animation_enabled)
@@ -705,78 +3960,168 @@ def script_defaults(settings):
 def script_description():
 	''' Setting the description of the plugin
 	'''
+	# OBS can ask for our description before our script is loaded
+	if Data.lang is None:
+		Data.lang = Lang(Data.lang_code)
 	return Data.lang.t('description')
 
 
 def script_load(settings):
 	''' Called for one-time init using values of data settings
 	'''
-	hotkey_get_random.htk_copy  = Hotkey(on_hotkey_get_random_phrase, settings, 'get_random_text', Data.lang.t('get_random'))
-	hotkey_show_phrase.htk_copy = Hotkey(on_hotkey_show_phrase_again, settings, 'show_phrase_again', Data.lang.t('show_phrase'))
-
+	Data.initialize()
+
+	# Creating our wheels now so their hotkeys are registered with the rest of OBS's
+	Data.set_wheel_count(obs.obs_data_get_int(settings, 'wheel_count'), settings)
+
+	# Keeping our source cache up to date with changes to sources
+	connect_source_signals()
+
+	# Reading our last session's state in the background, it's restored once script_update has applied our settings
+	Data.load_state()
+
+
+WHEEL_SETTING_TYPES = {
+	'source':         'string',
+	'phrases':        'string',
+	'phrases_file':   'string',
+	'phrases_unique': 'bool',
+}
+
+SETTING_TYPES = {
+	'lang':                   'string',
+	'wheel_count':            'int',
+	'phrase_lifetime':        'int',
+	'lists_dir':              'string',
+	'phrases_dir':            'string',
+	'animation_enabled':      'bool',
+	'animation_phrase_count': 'int',
+	'animation_deceleration': 'int',
+	'animation_length':       'int',
+	'animation_delay':        'int',
+	'separate_list_shuffle':  'bool',
+	'interanimation_length':  'int',
+	'start_sound_enabled':    'bool',
+	'start_sound_path':       'string',
+	'end_sound_enabled':      'bool',
+	'end_sound_path':         'string',
+	'warm_start':             'bool',
+	'trigger_policy':         'string',
+	'trigger_queue_depth':    'int',
+	'trigger_server_enabled': 'bool',
+	'trigger_server_port':    'int',
+}
+# Every wheel's own settings, see Wheel.setting_key
+SETTING_TYPES.update({Wheel.setting_key(key, index): setting_type for index in range(MAX_WHEELS) for key, setting_type in WHEEL_SETTING_TYPES.items()})
 
 def script_update(settings):
 	''' Called during initalization and after any update to the settings.
 
+	OBS calls this on every keystroke and slider tick, so settings are compared against the ones we last applied and only what they affect is rebuilt.
+
 	Arguments:
 		settings: the provided settings from OBS
 	'''
 	Data.settings = settings
 
-	# Updating language settings
-	Data.lang_code = obs.obs_data_get_string(settings, 'lang')
-	Data.lang      = Lang(Data.lang_code)
-
-	# Updating source name
-	Data.source_name = obs.obs_data_get_string(settings, 'source')
+	# Reading every setting and finding which ones changed since our last update
+	values = {key: getattr(obs, f'obs_data_get_{setting_type}')(settings, key) for key, setting_type in SETTING_TYPES.items()}
+	changed = {key for key, value in values.items() if Data.applied_settings.get(key) != value}
+	Data.applied_settings = values
 
-	# Gathering our phrases
-	Data.phrases = obs.obs_data_get_string(settings, 'phrases').splitlines()
-	Data.phrases = [phrase.strip().replace('\\n', '\n') for phrase in Data.phrases] # The list comp here is replacing the literal '\n' in the phrases with a newline char
-	# Removing empty strings from list
-	if '' in Data.phrases:
-		Data.phrases.remove('')
+	# Updating language settings
+	if 'lang' in changed:
+		Data.lang_code = values['lang']
+		Data.lang      = Lang(Data.lang_code)
 
-	# User is requesting that we don't duplicate phrases
-	Data.phrases_unique = obs.obs_data_get_bool(settings, 'phrases_unique')
-	Data.Randomizer.set_phrase_duplication(not Data.phrases_unique)
+	# Lists folder, phrases folder, phrase lifetime and warm start
+	Data.phrase_lifetime    = values['phrase_lifetime']
+	Data.lists_dir          = values['lists_dir']
+	Data.phrases_dir        = values['phrases_dir']
+	Data.warm_start_enabled = values['warm_start']
 
-	# Lists folder and phrase lifetime
-	Data.phrase_lifetime = obs.obs_data_get_int(   settings, 'phrase_lifetime')
-	Data.lists_dir       = obs.obs_data_get_string(settings, 'lists_dir')
+	# What happens to triggers while a wheel spins
+	Data.trigger_policy      = values['trigger_policy']
+	Data.trigger_queue_depth = values['trigger_queue_depth']
 
 	# Getting animation settings
-	Data.animation_enabled      = obs.obs_data_get_bool(settings, 'animation_enabled')
-	Data.animation_phrase_count = obs.obs_data_get_int( settings, 'animation_phrase_count')
-	Data.animation_deceleration = obs.obs_data_get_int( settings, 'animation_deceleration')
-	Data.animation_length       = obs.obs_data_get_int( settings, 'animation_length')
-	Data.animation_delay        = obs.obs_data_get_int( settings, 'animation_delay')
-	Data.separate_list_shuffle  = obs.obs_data_get_bool(settings, 'separate_list_shuffle')
-	Data.interanimation_length  = obs.obs_data_get_int( settings, 'interanimation_length')
-
-	# Setting our function
+	Data.animation_enabled      = values['animation_enabled']
+	Data.animation_phrase_count = values['animation_phrase_count']
+	Data.animation_deceleration = values['animation_deceleration']
+	Data.animation_length       = values['animation_length']
+	Data.animation_delay        = values['animation_delay']
+	Data.separate_list_shuffle  = values['separate_list_shuffle']
+	Data.interanimation_length  = values['interanimation_length']
+
+	# Our frame times only depend on the length and deceleration of our animation
+	if changed & {'animation_length', 'animation_deceleration'}:
+		Data.frame_times, Data.end_time = animation_frame_times(Data.animation_length, Data.animation_deceleration)
 
 	# Getting sound settings
-	Data.start_sound_enabled = obs.obs_data_get_bool(  settings, 'start_sound_enabled')
-	Data.start_sound_path    = obs.obs_data_get_string(settings, 'start_sound_path')
-	Data.end_sound_enabled   = obs.obs_data_get_bool(  settings, 'end_sound_enabled')
-	Data.end_sound_path      = obs.obs_data_get_string(settings, 'end_sound_path')
-
-	# Updating our randomizer
-	Data.Randomizer.set_phrase_list(Data.phrases)
-	Data.Randomizer.set_lists_dir(Data.lists_dir)
+	Data.start_sound_enabled = values['start_sound_enabled']
+	Data.start_sound_path    = values['start_sound_path']
+	Data.end_sound_enabled   = values['end_sound_enabled']
+	Data.end_sound_path      = values['end_sound_path']
+
+	# Every wheel shares our list cache
+	if 'lists_dir' in changed:
+		print(f'setting our new lists directory to `{Data.lists_dir}`')
+		Data.Lists.set_dir(Data.lists_dir)
+
+	# And our phrase files
+	if 'phrases_dir' in changed:
+		print(f'setting our new phrases directory to `{Data.phrases_dir}`')
+		Data.Pools.set_dir(Data.phrases_dir)
+
+	# Adding or removing wheels, then updating each wheel with its own settings
+	Data.wheel_count = values['wheel_count']
+	Data.set_wheel_count(Data.wheel_count, settings)
+	for wheel in Data.Wheels:
+		wheel.update(values, changed)
+
+	# Starting, moving or stopping our trigger server once our wheels are ready for it
+	Data.trigger_server_enabled = values['trigger_server_enabled']
+	Data.trigger_server_port    = values['trigger_server_port']
+	if changed & {'trigger_server_enabled', 'trigger_server_port'}:
+		if Data.trigger_server_enabled:
+			Data.Triggers.start(Data.trigger_server_port)
+		else:
+			Data.Triggers.stop()
 
-	# Saving our settings to file
+	# Saving our settings to file once they stop changing
 	Data.save_settings()
 
 
+def script_unload():
+	''' Called when the script is being unloaded. Stops any animation that is still playing and releases everything we hold on to.
+
+	https://obsproject.com/docs/scripting.html#script_unload
+	'''
+	Data.Triggers.stop()
+	Data.Scheduler.clear()
+	Data.save_settings(flush=True)
+	obs.timer_remove(warm_start_tick)
+
+	# Releasing our wheels and sources. Our state is saved once our wheels have put back the phrases of spins they never played.
+	connect_source_signals(False)
+	for wheel in Data.Wheels:
+		wheel.clear()
+	Data.save_state()
+	Data.Wheels = []
+	Data.Sources.clear()
+	Data.TextSources.clear()
+	Data.Worker.shutdown()
+
+
 def script_save(_):
 	''' Called when saving the script
 
 	https://obsproject.com/docs/scripting.html#script_save
 	'''
-	hotkey_get_random.htk_copy.save_hotkey()
-	Data.save_settings()
+	for wheel in Data.Wheels:
+		wheel.save_hotkeys()
+	Data.save_settings(flush=True)
+	Data.save_state()
 
 
 def script_properties():
@@ -796,30 +4141,31 @@ def script_properties():
 	for lang in AVAILABLE_LANGUAGES:
 		obs.obs_property_list_add_string(language_list, lang, lang)
 
+	wheel_count = obs.obs_properties_add_int_slider(Data.props,
+		'wheel_count',
+		Data.lang.t('wheel_count'),
+		1, MAX_WHEELS, 1)
+	obs.obs_property_set_modified_callback(wheel_count, on_wheel_count_modified)
+
 
 	# Source selection
 	######################################
+	source_names = Data.TextSources.names()
+
 	source_list = obs.obs_properties_add_list(Data.props,
 		'source',
 		Data.lang.t('source'),
 		obs.OBS_COMBO_TYPE_EDITABLE,
 		obs.OBS_COMBO_FORMAT_STRING)
 
-	# Checking if we have a valid list of sources
-	sources = obs.obs_enum_sources()
-	# Checking if there are sources
-	if sources is not None:
-		for source in sources:
-			# Only allow text id's
-			if obs.obs_source_get_unversioned_id(source) in ['text_gdiplus', 'text_ft2_source']:
-				source_name = obs.obs_source_get_name(source)
-				obs.obs_property_list_add_string(source_list, source_name, source_name)
-
-	# Releasing our access to sources
-	obs.source_list_release(sources)
+	for source_name in source_names:
+		obs.obs_property_list_add_string(source_list, source_name, source_name)
 
 	# Phrases field
 	######################################
+	phrase_files = list_phrase_files()
+	add_phrase_files(Data.props, 'phrases_file', phrase_files)
+
 	obs.obs_properties_add_text(Data.props,
 		'phrases',
 		Data.lang.t('Phrases'),
@@ -828,12 +4174,17 @@ def script_properties():
 	obs.obs_properties_add_button(Data.props,
 		'phrase_update_button',
 		Data.lang.t('phrases_update'),
-		on_click_update_phrases)
+		wheel_button(0, 'on_click_update_phrases'))
 
 	obs.obs_properties_add_bool(Data.props,
 		'phrases_unique',
 		Data.lang.t('phrases_unique'))
 
+	obs.obs_properties_add_text(Data.props,
+		'phrase_problems',
+		phrase_problems_text(0),
+		obs.OBS_TEXT_INFO)
+
 	obs.obs_properties_add_int_slider(Data.props,
 		'phrase_lifetime',
 		Data.lang.t('phrase_lifetime'),
@@ -846,6 +4197,66 @@ def script_properties():
 		'dir',
 		str(SCRIPT_DIRECTORY))
 
+	obs.obs_properties_add_path(Data.props,
+		'phrases_dir',
+		Data.lang.t('phrases_dir'),
+		obs.OBS_PATH_DIRECTORY,
+		'dir',
+		str(SCRIPT_DIRECTORY))
+
+	# Other wheels, only shown while they're in use
+	######################################
+	for index in range(1, MAX_WHEELS):
+		key = lambda name: Wheel.setting_key(name, index)
+		wheel_props = obs.obs_properties_create()
+
+		source_list = obs.obs_properties_add_list(wheel_props,
+			key('source'),
+			Data.lang.t('source'),
+			obs.OBS_COMBO_TYPE_EDITABLE,
+			obs.OBS_COMBO_FORMAT_STRING)
+
+		for source_name in source_names:
+			obs.obs_property_list_add_string(source_list, source_name, source_name)
+
+		add_phrase_files(wheel_props, key('phrases_file'), phrase_files)
+
+		obs.obs_properties_add_text(wheel_props,
+			key('phrases'),
+			Data.lang.t('Phrases'),
+			obs.OBS_TEXT_MULTILINE)
+
+		obs.obs_properties_add_button(wheel_props,
+			key('phrase_update_button'),
+			Data.lang.t('phrases_update'),
+			wheel_button(index, 'on_click_update_phrases'))
+
+		obs.obs_properties_add_bool(wheel_props,
+			key('phrases_unique'),
+			Data.lang.t('phrases_unique'))
+
+		obs.obs_properties_add_text(wheel_props,
+			key('phrase_problems'),
+			phrase_problems_text(index),
+			obs.OBS_TEXT_INFO)
+
+		obs.obs_properties_add_button(wheel_props,
+			key('phrase_generate_button'),
+			Data.lang.t('get_random'),
+			wheel_button(index, 'on_click_get_random_phrase'))
+
+		obs.obs_properties_add_button(wheel_props,
+			key('phrase_show_again'),
+			Data.lang.t('show_phrase'),
+			wheel_button(index, 'on_click_show_phrase_again'))
+
+		wheel_group = obs.obs_properties_add_group(Data.props,
+			f'wheel_{index + 1}',
+			f"{Data.lang.t('wheel')} {index + 1}",
+			obs.OBS_GROUP_NORMAL,
+			wheel_props)
+		obs.obs_property_set_visible(wheel_group, index < Data.wheel_count)
+
 	# Animation settings
 	######################################
 	obs.obs_properties_add_bool(Data.props,
@@ -910,16 +4321,87 @@ def script_properties():
 	obs.obs_properties_add_button(Data.props,
 		'phrase_generate_button',
 		Data.lang.t('get_random'),
-		on_click_get_random_phrase)
+		wheel_button(0, 'on_click_get_random_phrase'))
 
 	obs.obs_properties_add_button(Data.props,
 		'phrase_show_again',
 		Data.lang.t('show_phrase'),
-		on_click_show_phrase_again)
+		wheel_button(0, 'on_click_show_phrase_again'))
+
+	trigger_policy = obs.obs_properties_add_list(Data.props,
+		'trigger_policy',
+		Data.lang.t('trigger_policy'),
+		obs.OBS_COMBO_TYPE_LIST,
+		obs.OBS_COMBO_FORMAT_STRING)
+
+	for policy in Spin_Queue.POLICIES:
+		obs.obs_property_list_add_string(trigger_policy, Data.lang.t(f'trigger_policy_{policy}'), policy)
+
+	obs.obs_properties_add_int(Data.props,
+		'trigger_queue_depth',
+		Data.lang.t('trigger_queue_depth'),
+		1, 20, 1)
 
 	obs.obs_properties_add_button(Data.props,
 		'clear_cache_button',
 		Data.lang.t('clear_cache'),
 		on_click_clear_cache)
 
-	return Data.props
\ No newline at end of file
+	obs.obs_properties_add_button(Data.props,
+		'pack_lists_button',
+		Data.lang.t('pack_lists'),
+		on_click_pack_lists)
+
+	obs.obs_properties_add_bool(Data.props,
+		'warm_start',
+		Data.lang.t('warm_start'))
+
+	obs.obs_properties_add_bool(Data.props,
+		'trigger_server_enabled',
+		Data.lang.t('trigger_server_enabled'))
+
+	obs.obs_properties_add_int(Data.props,
+		'trigger_server_port',
+		Data.lang.t('trigger_server_port'),
+		1024, 65535, 1)
+
+	# Metrics
+	######################################
+	obs.obs_properties_add_text(Data.props,
+		'metrics_summary',
+		Data.Metrics.summary_text() or Data.lang.t('metrics_empty'),
+		obs.OBS_TEXT_INFO)
+
+	obs.obs_properties_add_button(Data.props,
+		'metrics_dump_button',
+		Data.lang.t('metrics_dump'),
+		on_click_dump_metrics)
+
+	return Data.props
+
+
+# Command line
+########################################
+
+def main(arguments:list=None) -> int:
+	''' Command line entry point, for work that doesn't need OBS running.
+
+	Usage:
+		python phrase-randomizer.py pack [lists_dir]
+		python phrase-randomizer.py pack --phrases [phrases_dir]
+	'''
+	parser = argparse.ArgumentParser(description='Tools for the phrase randomizer OBS script.')
+	commands = parser.add_subparsers(dest='command', required=True)
+	pack_parser = commands.add_parser('pack', help=f'Pack every list in a lists directory into {PACKED_LISTS_FILE}.')
+	pack_parser.add_argument('lists_dir', type=Path, nargs='?', help='Lists directory to pack (default: the lists folder next to this script, or the phrases folder with --phrases).')
+	pack_parser.add_argument('--phrases', action='store_true', help='Pack a directory of phrase files, dropping blank lines like phrases in the settings.')
+	arguments = parser.parse_args(arguments)
+
+	if arguments.command == 'pack':
+		lists_dir = arguments.lists_dir or (Data.phrases_dir if arguments.phrases else Data.lists_dir)
+		List_Cache(lists_dir, phrases=arguments.phrases).pack()
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())